@@ -113,3 +113,75 @@ document.getElementById('conversion-form').addEventListener('submit', async (e)
         resultTextElement.textContent = `An error occurred: ${error.message}`;
     }
 });
+
+// Live conversion while typing: keystrokes go over a WebSocket and the
+// server answers with the number in the target base plus 2, 8, 10 and 16
+const liveNumber = document.getElementById('number');
+const liveResultElement = document.getElementById('live-result-text');
+let liveSocket = null;
+let liveConfig = '';
+let liveSent = '';
+
+function liveSend(message) {
+    if (liveSocket && liveSocket.readyState === WebSocket.OPEN) {
+        liveSocket.send(JSON.stringify(message));
+    }
+}
+
+function liveUpdate() {
+    const from_base = parseInt(document.getElementById('from_base').value, 10);
+    const to_base = parseInt(document.getElementById('to_base').value, 10);
+    if (!from_base) {
+        return;
+    }
+    const to_bases = [...new Set([to_base || 10, 2, 8, 10, 16])];
+    const config = JSON.stringify({ from_base: from_base, to_bases: to_bases });
+    const text = liveNumber.value;
+
+    // Send only what changed: appended characters, backspaces, or the whole number
+    const message = {};
+    if (config !== liveConfig) {
+        message.config = JSON.parse(config);
+        message.set = text;
+    } else if (text.startsWith(liveSent)) {
+        message.append = text.slice(liveSent.length);
+    } else if (liveSent.startsWith(text)) {
+        message.delete = liveSent.length - text.length;
+    } else {
+        message.set = text;
+    }
+    liveConfig = config;
+    liveSent = text;
+    liveSend(message);
+}
+
+function liveConnect() {
+    const scheme = location.protocol === 'https:' ? 'wss' : 'ws';
+    liveSocket = new WebSocket(`${scheme}://${location.host}/convert/ws`);
+    liveSocket.addEventListener('open', () => {
+        liveConfig = '';
+        liveUpdate();
+    });
+    liveSocket.addEventListener('message', (event) => {
+        const data = JSON.parse(event.data);
+        if (data.error) {
+            liveResultElement.textContent = `Error: ${data.error}`;
+            // the server kept its previous number, so resend the whole one next time
+            liveConfig = '';
+            return;
+        }
+        liveResultElement.textContent = Object.entries(data.results)
+            .map(([base, value]) => `Base ${base}: ${value}`)
+            .join('\n');
+    });
+    liveSocket.addEventListener('close', () => {
+        liveSocket = null;
+    });
+}
+
+if (liveResultElement) {
+    liveConnect();
+    for (const id of ['number', 'from_base', 'to_base']) {
+        document.getElementById(id).addEventListener('input', liveUpdate);
+    }
+}
@@ -0,0 +1,95 @@
+# ================= assets.py =================
+#  The frontend's static files, read once and kept in memory together
+#  with a gzipped copy and an ETag for each.  Only the listed files are
+#  served, so the rest of the project directory stays private.  Clients
+#  revalidate with If-None-Match and get a bodyless 304 when unchanged.
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from fastapi import HTTPException, status
+from starlette.responses import Response
+
+
+class Asset:
+    """One file's bytes, its gzipped copy (None if no smaller) and ETag."""
+    __slots__ = ('body', 'gzipped', 'etag', 'media_type')
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        self.gzipped = gzipped if len(gzipped) < len(body) else None
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.media_type = media_type
+
+    @property
+    def gzip_etag(self) -> str:
+        # the gzipped bytes are a different representation, so a different tag
+        return self.etag[:-1] + '-gzip"'
+
+
+def _media_type(name: str) -> str:
+    media_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    return media_type + '; charset=utf-8' if media_type.startswith('text/') else media_type
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.lower().split(','):
+        name, _, params = coding.partition(';')
+        if name.strip() in ('gzip', '*'):
+            q = params.strip()
+            if not q.startswith('q='):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def _etag_matches(if_none_match: str, *etags: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return not tags.isdisjoint(etags)
+
+
+class StaticAssets:
+    """In-memory copies of `names` from `directory`, loaded on first use
+    or all at once by load()."""
+    __slots__ = ('directory', 'names', 'cache_control', 'assets')
+
+    def __init__(self, directory: str, names, max_age: int = 0):
+        self.directory = directory
+        self.names = frozenset(names)
+        self.cache_control = f'public, max-age={max_age}' if max_age > 0 else 'no-cache'
+        self.assets = {}
+
+    def load(self):
+        for name in self.names:
+            self.get(name)
+
+    def get(self, name: str) -> Asset:
+        asset = self.assets.get(name)
+        if asset is None and name in self.names:
+            with open(os.path.join(self.directory, name), 'rb') as f:
+                asset = self.assets[name] = Asset(f.read(), _media_type(name))
+        return asset
+
+    def response(self, name: str, headers) -> Response:
+        """The asset for request `headers`: gzipped if accepted, 304 if the
+        client's copy is current; 404 for names outside the list."""
+        asset = self.get(name)
+        if asset is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+        gzipped = asset.gzipped is not None and _accepts_gzip(headers.get('accept-encoding', ''))
+        etag = asset.gzip_etag if gzipped else asset.etag
+        response_headers = {'ETag': etag, 'Cache-Control': self.cache_control, 'Vary': 'Accept-Encoding'}
+        if _etag_matches(headers.get('if-none-match', ''), asset.etag, asset.gzip_etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+        if gzipped:
+            response_headers['Content-Encoding'] = 'gzip'
+        return Response(asset.gzipped if gzipped else asset.body, media_type=asset.media_type,
+                        headers=response_headers)
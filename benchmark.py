@@ -0,0 +1,352 @@
+# ================= benchmark.py =================
+#  Reproducible benchmarks for module_1 (base conversion) and module_2
+#  (binary arithmetic).  Standard library only; NumPy batch kernels are
+#  benchmarked too when NumPy is installed.
+#
+#    python benchmark.py run --output bench.json [--quick] [--filter alu/]
+#    python benchmark.py compare baseline.json bench.json [--threshold 0.1]
+#
+#  Inputs come from a seeded RNG, and the uncached code paths are timed
+#  (conversion_outcome / compute_operation) so the result caches never
+#  turn a benchmark into a dictionary lookup.  The cache/ benchmarks time
+#  the caches themselves against recomputing the same results.
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import module_1
+import module_2
+from cache import LRUCache
+from shared_cache import SharedCache
+
+SEED = 20240601
+
+WIDTHS = (8, 16, 32, 64, 256, 1024, 4096, 16384, 65536)
+QUICK_WIDTHS = (8, 64, 1024, 65536)
+
+REPRESENTATIONS = ('unsigned', 'signed', 'ones_complement', 'twos_complement')
+OPERATIONS = ('add', 'subtract', 'multiply', 'divide')
+
+# All base pairs run at this length; the length sweep uses the pairs below
+PAIR_LENGTH = 16
+LENGTHS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+QUICK_LENGTHS = (10, 1_000, 100_000)
+LENGTH_PAIRS = ((2, 16), (16, 2), (10, 2), (2, 10), (7, 13), (20, 3))
+
+# The float path overflows past ~300 digits, longer inputs use the exact path
+FLOAT_MAX_LENGTH = 100
+
+BATCH_SIZE = 10_000
+
+# Cached results: conversions at these lengths, products at these widths
+CACHE_LENGTHS = (16, 1_000)
+CACHE_WIDTHS = (64, 4096)
+CACHE_FILL = 1024
+CACHE_SLOTS = 2 * CACHE_FILL
+
+
+class Case:
+    """One benchmark: a name, a zero-argument callable and its work size."""
+    __slots__ = ('name', 'func', 'items')
+
+    def __init__(self, name: str, func, items: int = 1):
+        self.name = name
+        self.func = func
+        self.items = items  # operations per call (batch kernels do many)
+
+
+def _digits(rng: random.Random, base: int, length: int) -> str:
+    digits = module_1.DIGITS[:base]
+    return rng.choice(digits[1:]) + ''.join(rng.choices(digits, k=length - 1))
+
+
+def _bits(rng: random.Random, width: int) -> str:
+    return format(rng.getrandbits(width), f'0{width}b')
+
+
+def alu_cases(widths, rng: random.Random) -> list[Case]:
+    cases = []
+    for w in widths:
+        for rep in REPRESENTATIONS:
+            for op in OPERATIONS:
+                a, b = _bits(rng, w), _bits(rng, w)
+                if op == 'divide':
+                    b = _bits(rng, w // 2).rjust(w, '0')  # non-trivial quotient
+                cases.append(Case(f'alu/{rep}/{op}/w{w}',
+                                  lambda a=a, b=b, w=w, rep=rep, op=op:
+                                  module_2.compute_operation(a, b, w, rep, op)))
+    return cases
+
+
+def conversion_cases(lengths, rng: random.Random, all_pairs: bool) -> list[Case]:
+    cases = []
+
+    def add(base1, base2, length):
+        num = _digits(rng, base1, length)
+        exact = length > FLOAT_MAX_LENGTH
+        mode = 'exact' if exact else 'float'
+        cases.append(Case(f'convert/{base1}-{base2}/len{length}/{mode}',
+                          lambda: module_1.conversion_outcome(num, base1, base2, module_1.DIGITS, exact)))
+
+    if all_pairs:
+        for base1 in range(2, module_1.MAX_BASE + 1):
+            for base2 in range(2, module_1.MAX_BASE + 1):
+                if base1 != base2:
+                    add(base1, base2, PAIR_LENGTH)
+    for base1, base2 in LENGTH_PAIRS:
+        for length in lengths:
+            add(base1, base2, length)
+    return cases
+
+
+def batch_cases(rng: random.Random) -> list[Case]:
+    if module_2.np is None:
+        return []
+    np = module_2.np
+    cases = []
+    for w in (8, 32, 64):
+        a = np.array([rng.getrandbits(w) for _ in range(BATCH_SIZE)], dtype=np.uint64)
+        b = np.array([rng.getrandbits(w) | 1 for _ in range(BATCH_SIZE)], dtype=np.uint64)
+        for rep in REPRESENTATIONS:
+            for op in OPERATIONS:
+                cases.append(Case(f'batch/{rep}/{op}/w{w}',
+                                  lambda a=a, b=b, w=w, rep=rep, op=op:
+                                  module_2.batch_operation(a, b, w, rep, op),
+                                  items=BATCH_SIZE))
+    return cases
+
+
+class SharedCacheBench:
+    """The cache/ benchmarks' caches.  The shared ones live in temporary
+    files, created by open() only if one of the cases runs (in RAM where
+    /dev/shm exists) and removed by close()."""
+    __slots__ = ('samples', 'values', 'local', 'caches', 'directory')
+
+    def __init__(self):
+        self.samples = []  # (name, key, compute, shared cache name)
+        self.values = {}  # name -> computed value
+        self.local = LRUCache(max_entries=2 * CACHE_FILL)
+        self.caches = {}
+        self.directory = None
+
+    def cases(self, rng: random.Random) -> list[Case]:
+        digits = module_1.DIGITS
+        for length in CACHE_LENGTHS:
+            num = _digits(rng, 10, length)
+            self.samples.append((f'convert/len{length}', module_1.conversion_key(num, 10, 2, digits, True),
+                                 lambda num=num: module_1.conversion_outcome(num, 10, 2, digits, True),
+                                 'conversion'))
+        for w in CACHE_WIDTHS:
+            a, b = _bits(rng, w), _bits(rng, w)
+            self.samples.append((f'multiply/w{w}', module_2.operation_key(a, b, w, 'unsigned', 'multiply'),
+                                 lambda a=a, b=b, w=w: module_2.compute_operation(a, b, w, 'unsigned', 'multiply'),
+                                 'binary'))
+        cases = []
+        for name, key, compute, kind in self.samples:
+            missing = key + ('absent',)
+            cases += [
+                Case(f'cache/{name}/recompute', compute),
+                Case(f'cache/{name}/local_hit', lambda key=key: self.local.get(key)),
+                Case(f'cache/{name}/shared_hit', lambda key=key, kind=kind: self.caches[kind].get(key)),
+                Case(f'cache/{name}/shared_miss', lambda key=missing, kind=kind: self.caches[kind].get(key)),
+                Case(f'cache/{name}/shared_put',
+                     lambda key=key, kind=kind, name=name: self.caches[kind].put(key, self.values[name])),
+            ]
+        return cases
+
+    def open(self, rng: random.Random):
+        self.directory = tempfile.mkdtemp(dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+        codecs = {'conversion': (module_1.encode_outcome, module_1.decode_outcome),
+                  'binary': (module_2.ALUResult.encode, module_2.ALUResult.decode)}
+        for kind, (encode, decode) in codecs.items():
+            self.caches[kind] = SharedCache(os.path.join(self.directory, kind), CACHE_SLOTS,
+                                            encode=encode, decode=decode)
+        # half full, so probes see occupied neighbours
+        for i in range(CACHE_FILL):
+            self.caches['conversion'].put(('fill', i), ('ok', _bits(rng, 64)))
+            self.caches['binary'].put(('fill', i), module_2.compute_operation(_bits(rng, 8), _bits(rng, 8), 8,
+                                                                              'unsigned', 'add'))
+        for name, key, compute, kind in self.samples:
+            value = self.values[name] = compute()
+            self.local.put(key, value)
+            self.caches[kind].put(key, value)
+
+    def close(self):
+        for cache in self.caches.values():
+            cache.close()
+        self.caches = {}
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+
+def build_cases(quick: bool = False, shared: SharedCacheBench = None) -> list[Case]:
+    rng = random.Random(SEED)
+    return (alu_cases(QUICK_WIDTHS if quick else WIDTHS, rng)
+            + conversion_cases(QUICK_LENGTHS if quick else LENGTHS, rng, all_pairs=not quick)
+            + batch_cases(rng)
+            + (shared.cases(rng) if shared is not None else []))
+
+
+def _rate(ops_per_sec: float) -> str:
+    return f"{ops_per_sec:,.0f}" if ops_per_sec >= 100 else f"{ops_per_sec:.3g}"
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def _best_loop(func, budget: float, rounds: int = 5) -> float:
+    # timeit-style: loops long enough to swamp timer overhead, best of `rounds`
+    clock = time.perf_counter_ns
+    number = 1
+    while True:
+        start = clock()
+        for _ in range(number):
+            func()
+        elapsed = clock() - start
+        if elapsed * rounds >= budget * 1e9 or number >= 1 << 20:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(rounds - 1):
+        start = clock()
+        for _ in range(number):
+            func()
+        best = min(best, clock() - start)
+    return (best or 1) / number
+
+
+def measure(case: Case, budget: float = 0.2, min_runs: int = 5, max_runs: int = 100_000) -> dict:
+    """Time case.func for about 2 * `budget` seconds, then trace one call's memory.
+
+    Throughput comes from the best of several loops (the least disturbed by
+    other processes), latency percentiles from individually timed calls.
+    """
+    case.func()  # warm up caches and lazily built state
+    timings = []
+    clock = time.perf_counter_ns
+    deadline = clock() + int(budget * 1e9)
+    while len(timings) < max_runs and (len(timings) < min_runs or clock() < deadline):
+        start = clock()
+        case.func()
+        timings.append(clock() - start)
+    per_call = _best_loop(case.func, budget)
+
+    tracemalloc.start()
+    try:
+        case.func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'ops_per_sec': case.items * 1e9 / per_call,
+        'p50_us': _percentile(timings, 0.50) / 1000,
+        'p99_us': _percentile(timings, 0.99) / 1000,
+        'peak_bytes': peak,
+        'runs': len(timings),
+    }
+
+
+def run(output: str, quick: bool = False, name_filter: str = '', budget: float = 0.2) -> dict:
+    shared = SharedCacheBench()
+    cases = [case for case in build_cases(quick, shared) if name_filter in case.name]
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'numpy': getattr(module_2.np, '__version__', None),
+            'seed': SEED,
+            'quick': quick,
+            'budget_s': budget,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': {},
+    }
+    try:
+        if any(case.name.startswith('cache/') for case in cases):
+            shared.open(random.Random(SEED))
+        for number, case in enumerate(cases, 1):
+            result = measure(case, budget)
+            report['results'][case.name] = result
+            print(f"[{number}/{len(cases)}] {case.name}: {_rate(result['ops_per_sec'])} ops/s, "
+                  f"p50 {result['p50_us']:.1f}us, p99 {result['p99_us']:.1f}us, "
+                  f"peak {result['peak_bytes'] / 1024:.0f} KiB", flush=True)
+    finally:
+        shared.close()
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+    print(f"Wrote {len(cases)} results to {output}")
+    return report
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> list[str]:
+    """Names of benchmarks whose throughput dropped by more than `threshold`."""
+    regressions = []
+    base_results, new_results = baseline['results'], current['results']
+    for name in sorted(base_results.keys() & new_results.keys()):
+        old, new = base_results[name]['ops_per_sec'], new_results[name]['ops_per_sec']
+        change = new / old - 1 if old else 0.0
+        if change < -threshold:
+            regressions.append(name)
+            flag = 'REGRESSION'
+        elif change > threshold:
+            flag = 'faster'
+        else:
+            continue
+        print(f"{flag:>10} {name}: {_rate(old)} -> {_rate(new)} ops/s ({change:+.1%}), "
+              f"p99 {base_results[name]['p99_us']:.1f} -> {new_results[name]['p99_us']:.1f}us")
+    missing = len(base_results.keys() - new_results.keys())
+    if missing:
+        print(f"{missing} baseline benchmark(s) not in the current report")
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark base conversion and binary arithmetic.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the benchmarks and save a JSON report")
+    run_parser.add_argument('--output', default='bench.json')
+    run_parser.add_argument('--quick', action='store_true', help="fewer widths, lengths and base pairs")
+    run_parser.add_argument('--filter', default='', help="only run benchmarks whose name contains this")
+    run_parser.add_argument('--budget', type=float, default=0.2, help="seconds of timing per benchmark")
+    run_parser.add_argument('--baseline', help="compare against this report afterwards")
+    run_parser.add_argument('--threshold', type=float, default=0.10)
+
+    compare_parser = commands.add_parser('compare', help="flag regressions between two reports")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        current = run(args.output, args.quick, args.filter, args.budget)
+        if not args.baseline:
+            return 0
+        baseline_file = args.baseline
+    else:
+        with open(args.current) as f:
+            current = json.load(f)
+        baseline_file = args.baseline
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    return 1 if compare(baseline, current, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
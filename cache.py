@@ -0,0 +1,108 @@
+# ================= cache.py =================
+#  Bounded in-process LRU cache for conversion and arithmetic results.
+#  Entries are evicted least-recently-used first once either the entry
+#  count or the approximate byte budget is exceeded; nothing expires.
+#  An optional backing cache (e.g. shared_cache.SharedCache, shared by
+#  every worker process) is consulted on misses and written through.
+
+from collections import OrderedDict
+from threading import Lock
+
+_MISSING = object()
+
+# Rough per-entry bookkeeping cost (dict slot, tuple, small objects)
+ENTRY_OVERHEAD = 200
+
+
+def approx_size(obj) -> int:
+    # cheap byte estimate of a key or value built from strings and ints
+    if isinstance(obj, str):
+        return len(obj)
+    if isinstance(obj, (tuple, list)):
+        return sum(approx_size(item) for item in obj)
+    if isinstance(obj, int):
+        return obj.bit_length() // 8 + 8
+    return 64
+
+
+class LRUCache:
+    """LRU cache bounded by entry count and by approximate bytes."""
+    __slots__ = ('max_entries', 'max_bytes', 'sizeof', 'hits', 'misses', 'evictions',
+                 'bytes', 'backing', '_data', '_lock')
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 << 20, sizeof=approx_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self.backing = None  # second-level cache with the same get/put
+        self._data = OrderedDict()  # key -> (value, size)
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        if self.backing is not None:
+            value = self.backing.get(key, _MISSING)
+            if value is not _MISSING:
+                self._store(key, value)
+                return value
+        return default
+
+    def put(self, key, value):
+        self._store(key, value)
+        if self.backing is not None:
+            self.backing.put(key, value)
+
+    def _store(self, key, value):
+        if self.max_entries <= 0:
+            return
+        size = self.sizeof(key) + self.sizeof(value) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return  # would evict everything else
+        with self._lock:
+            old = self._data.pop(key, _MISSING)
+            if old is not _MISSING:
+                self.bytes -= old[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            self._trim()
+
+    def _trim(self):
+        while self._data and (len(self._data) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, evicted) = self._data.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def configure(self, max_entries: int, max_bytes: int):
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._trim()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,401 @@
+# ================= loadgen.py =================
+#  Load generator for main.app.  Replays a JSONL log of /convert and
+#  /binary/operation calls (or a seeded synthetic mix) over keep-alive
+#  HTTP/1.1 connections, either at a fixed arrival rate (--rps) or with a
+#  fixed number of requests in flight (--concurrency), and reports
+#  throughput, latency percentiles and errors per endpoint and
+#  representation.  Standard library only.
+#
+#    python loadgen.py --spawn --synthetic --concurrency 32 --duration 20
+#    python loadgen.py --url http://127.0.0.1:8000 --log calls.jsonl --rps 500
+#    python loadgen.py ... --output load.json --baseline previous.json
+#
+#  Log lines are {"path": "/convert", "body": {...}}; a bare request body
+#  is sent to /binary/operation if it has binary1, else to /convert.
+#  Logs replay in their recorded order; --shuffle reorders them by --seed.
+#  At a fixed rate, latency is measured from when each request was due,
+#  not from when a connection came free, so a stalling server shows up
+#  in the tail instead of quietly lowering the offered load.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from module_1 import DIGITS, MAX_BASE
+from module_2 import REPRESENTATION_NAMES
+
+SEED = 20240601
+
+# Synthetic mix
+SYNTHETIC_CALLS = 10_000  # distinct calls generated, then cycled
+BINARY_WIDTHS = (4, 8, 8, 16, 16, 32, 64, 256, 1024)
+BINARY_OPERATIONS = ('add', 'subtract', 'multiply', 'divide')
+CONVERT_LENGTHS = (1, 4, 8, 16, 32, 64)
+
+
+class Call:
+    """One request to send: path, encoded JSON body and its report group."""
+    __slots__ = ('path', 'body', 'group')
+
+    def __init__(self, path: str, body: dict):
+        self.path = path
+        self.body = json.dumps(body).encode()
+        self.group = f'{path} {_label(path, body)}'
+
+
+def _label(path: str, body: dict) -> str:
+    # the representation for arithmetic; float or exact for conversions
+    if path.startswith('/binary'):
+        return str(body.get('representation', 'unsigned')).lower()
+    return 'exact' if body.get('exact') else 'float'
+
+
+def read_log(path: str) -> list[Call]:
+    calls = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f'{path}:{number}: expected a JSON object')
+            if 'body' in record:
+                calls.append(Call(record.get('path', '/convert'), record['body']))
+            else:
+                calls.append(Call('/binary/operation' if 'binary1' in record else '/convert', record))
+    if not calls:
+        raise ValueError(f'{path} has no requests')
+    return calls
+
+
+def synthetic_calls(rng: random.Random, binary_share: float = 0.5,
+                    count: int = SYNTHETIC_CALLS) -> list[Call]:
+    calls = []
+    for _ in range(count):
+        if rng.random() < binary_share:
+            w = rng.choice(BINARY_WIDTHS)
+            calls.append(Call('/binary/operation', {
+                'binary1': format(rng.getrandbits(w), f'0{w}b'),
+                'binary2': format(rng.getrandbits(w) | 1, f'0{w}b'),
+                'num_bits': w,
+                'operation': rng.choice(BINARY_OPERATIONS),
+                'representation': rng.choice(REPRESENTATION_NAMES),
+            }))
+        else:
+            base1, base2 = rng.sample(range(2, MAX_BASE + 1), 2)
+            digits = DIGITS[:base1]
+            number = ''.join(rng.choices(digits, k=rng.choice(CONVERT_LENGTHS)))
+            if rng.random() < 0.3:
+                number += '.' + ''.join(rng.choices(digits, k=rng.randint(1, 6)))
+            calls.append(Call('/convert', {
+                'number': number, 'from_base': base1, 'to_base': base2,
+                'exact': rng.random() < 0.2,
+            }))
+    return calls
+
+
+# --------------------------------------------------
+# HTTP/1.1 client
+# --------------------------------------------------
+
+class Connection:
+    """A keep-alive connection, reopened after errors or Connection: close."""
+    __slots__ = ('host', 'port', 'reader', 'writer')
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def post(self, path: str, body: bytes) -> tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(b'POST %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n'
+                          b'Content-Length: %d\r\n\r\n%s'
+                          % (path.encode(), self.host.encode(), len(body), body))
+        reader = self.reader
+        status = int((await reader.readline()).split(None, 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.partition(b':')
+            headers[name.strip().lower()] = value.strip().lower()
+        if headers.get(b'transfer-encoding') == b'chunked':
+            payload = b''
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if not size:
+                    break
+                payload += chunk[:-2]
+        else:
+            payload = await reader.readexactly(int(headers.get(b'content-length', 0)))
+        if headers.get(b'connection') == b'close':
+            self.close()
+        return status, payload
+
+
+def _error_kind(status: int, payload: bytes):
+    # None for a successful call; the API reports most failures as 200 + {"error": ...}
+    if status >= 400:
+        return f'http_{status}'
+    if payload.startswith(b'{"error"'):
+        return 'error'
+    return None
+
+
+# --------------------------------------------------
+# Load
+# --------------------------------------------------
+
+class Stats:
+    """Latencies (seconds) and error counts per report group."""
+    __slots__ = ('latencies', 'errors', 'started', 'elapsed')
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def record(self, group: str, latency: float, error):
+        self.latencies.setdefault(group, []).append(latency)
+        if error:
+            errors = self.errors.setdefault(group, {})
+            errors[error] = errors.get(error, 0) + 1
+
+
+async def _worker(connection: Connection, queue: asyncio.Queue, stats: Stats):
+    clock = time.perf_counter
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        due, call = item
+        start = clock() if due is None else due
+        try:
+            status, payload = await connection.post(call.path, call.body)
+            error = _error_kind(status, payload)
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            connection.close()
+            error = f'connection_{type(e).__name__}'
+        stats.record(call.group, clock() - start, error)
+
+
+async def run_load(calls: list[Call], url: str, rps: float = None, concurrency: int = 16,
+                   duration: float = 10.0, total: int = None) -> Stats:
+    """Send calls (cycled) until duration seconds pass or total are sent.
+
+    With rps, requests are due at a constant rate and handed to
+    `concurrency` connections; otherwise each connection sends its next
+    request as soon as the last one is answered.
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname or '127.0.0.1', parts.port or 80
+    # with a rate, a short queue keeps dispatch on schedule; without, workers pull directly
+    queue = asyncio.Queue(maxsize=concurrency * 4 if rps else concurrency)
+    connections = [Connection(host, port) for _ in range(concurrency)]
+    stats = Stats()
+    workers = [asyncio.create_task(_worker(c, queue, stats)) for c in connections]
+
+    clock = time.perf_counter
+    start = stats.started = clock()
+    deadline = start + duration
+    sent = 0
+    while (total is None or sent < total) and clock() < deadline:
+        call = calls[sent % len(calls)]
+        if rps:
+            due = start + sent / rps
+            delay = due - clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await queue.put((due, call))
+        else:
+            await queue.put((None, call))
+        sent += 1
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    stats.elapsed = clock() - start
+    for connection in connections:
+        connection.close()
+    return stats
+
+
+# --------------------------------------------------
+# Report
+# --------------------------------------------------
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def _summary(latencies: list, errors: dict, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    failed = sum(errors.values())
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': _percentile(latencies, 0.50) * 1000,
+        'p95_ms': _percentile(latencies, 0.95) * 1000,
+        'p99_ms': _percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000,
+        'error_rate': failed / len(latencies),
+        'errors': dict(sorted(errors.items())),
+    }
+
+
+def report(stats: Stats) -> dict:
+    groups = {group: _summary(latencies, stats.errors.get(group, {}), stats.elapsed)
+              for group, latencies in sorted(stats.latencies.items())}
+    every = [x for latencies in stats.latencies.values() for x in latencies]
+    errors = {}
+    for counts in stats.errors.values():
+        for kind, count in counts.items():
+            errors[kind] = errors.get(kind, 0) + count
+    return {'groups': groups, 'total': _summary(every, errors, stats.elapsed) if every else None}
+
+
+def print_report(result: dict):
+    rows = list(result['groups'].items()) + [('total', result['total'])]
+    width = max(len(name) for name, _ in rows)
+    print(f"{'group':<{width}} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+    for name, row in rows:
+        if row is None:
+            continue
+        print(f"{name:<{width}} {row['requests']:>9} {row['rps']:>9.1f} {row['p50_ms']:>8.2f} "
+              f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f} "
+              f"{row['error_rate']:>7.1%}")
+    errors = (result['total'] or {}).get('errors')
+    if errors:
+        print('errors: ' + ', '.join(f'{kind} {count}' for kind, count in errors.items()))
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> list[str]:
+    """Groups whose p99 grew, or throughput fell, by more than `threshold`."""
+    regressions = []
+    old_groups, new_groups = baseline['groups'], current['groups']
+    for name in sorted(old_groups.keys() & new_groups.keys()):
+        old, new = old_groups[name], new_groups[name]
+        p99 = new['p99_ms'] / old['p99_ms'] - 1 if old['p99_ms'] else 0.0
+        rps = new['rps'] / old['rps'] - 1 if old['rps'] else 0.0
+        if p99 > threshold or rps < -threshold:
+            regressions.append(name)
+            print(f"REGRESSION {name}: p99 {old['p99_ms']:.2f} -> {new['p99_ms']:.2f}ms ({p99:+.1%}), "
+                  f"{old['rps']:.1f} -> {new['rps']:.1f} req/s ({rps:+.1%})")
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+# --------------------------------------------------
+# Local server
+# --------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(port: int, workers: int = 1, timeout: float = 30.0) -> subprocess.Popen:
+    """Start uvicorn on main:app and wait until it accepts connections."""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning', '--no-access-log'],
+        cwd=os.path.dirname(os.path.abspath(__file__)))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'uvicorn exited with status {server.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f'uvicorn did not start within {timeout:.0f}s')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Drive main.app with a request log or synthetic load.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--log', help="JSONL file of calls to replay")
+    source.add_argument('--synthetic', action='store_true', help="seeded mix of conversions and arithmetic")
+    parser.add_argument('--binary-share', type=float, default=0.5,
+                        help="fraction of synthetic calls that are binary operations")
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help="server to load")
+    parser.add_argument('--spawn', action='store_true', help="start a local uvicorn instead of using --url")
+    parser.add_argument('--server-workers', type=int, default=1, help="uvicorn workers with --spawn")
+    parser.add_argument('--rps', type=float, help="fixed arrival rate; default is closed-loop")
+    parser.add_argument('--concurrency', type=int, default=16, help="open connections")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to send for")
+    parser.add_argument('--requests', type=int, help="stop after this many requests")
+    parser.add_argument('--warmup', type=float, default=1.0, help="seconds of unreported load first")
+    parser.add_argument('--shuffle', action='store_true', help="replay --log calls in seeded random order")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--output', help="save the report as JSON")
+    parser.add_argument('--baseline', help="compare against a saved report")
+    parser.add_argument('--threshold', type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    calls = read_log(args.log) if args.log else synthetic_calls(rng, args.binary_share)
+    if args.log and args.shuffle:
+        rng.shuffle(calls)
+
+    server = None
+    url = args.url
+    if args.spawn:
+        port = _free_port()
+        server = spawn_server(port, args.server_workers)
+        url = f'http://127.0.0.1:{port}'
+    try:
+        if args.warmup > 0:
+            asyncio.run(run_load(calls, url, args.rps, args.concurrency, args.warmup))
+        stats = asyncio.run(run_load(calls, url, args.rps, args.concurrency, args.duration, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    result = report(stats)
+    if result['total'] is None:
+        print('No requests completed')
+        return 1
+    result['meta'] = {
+        'url': url, 'source': args.log or 'synthetic', 'rps': args.rps, 'concurrency': args.concurrency,
+        'duration_s': stats.elapsed, 'seed': args.seed,
+        'shuffle': args.shuffle, 'python': platform.python_version(),
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=1, sort_keys=True)
+        print(f"Wrote report to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return 1 if compare(baseline, result, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
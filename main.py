@@ -1,26 +1,252 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from module_1 import baseConverter
+from time import perf_counter
+
+_import_started = perf_counter()  # startup is timed from here, imports are most of it
+
+import asyncio
+import copy
+import json
+import os
+import secrets
+import threading
+from concurrent.futures import BrokenExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from module_1 import (
+    DIGITS, IncrementalConverter, batchConverter, conversion_cache, conversion_key, conversion_outcome,
+    decode_outcome, encode_outcome, fraction_request, resolve_outcome,
+)
 from module_2 import (
-    binary_addition, binary_subtraction, binary_multiplication, binary_division,
-    signed_binary_addition, signed_binary_subtraction, signed_binary_multiplication, signed_binary_division,
-    ones_complement_addition, ones_complement_subtraction, ones_complement_multiplication, ones_complement_division,
-    twos_complement_addition, twos_complement_subtraction, twos_complement_multiplication, twos_complement_division
+    BAD_INPUT, OPERATION_NAMES, PACKED_ENCODINGS, REPRESENTATION_NAMES, REPRESENTATIONS, ALUResult,
+    compute_operation, compute_packed, operation_cache, operation_key, packed_encoder, packed_key,
+    resolve_operation, small_tables,
 )
-from fastapi.staticfiles import StaticFiles
-from starlette.responses import FileResponse  
+from metrics import LENGTH_BUCKETS, WIDTH_BUCKETS, InFlightMiddleware, Registry, size_bucket
+from profiling import ProfilerMiddleware, RollingProfile, profile_call, profiling
+from assets import StaticAssets
+from shared_cache import SharedCache, source_tag
+try:
+    import msgpack
+except ImportError:  # /binary/operation/packed is optional
+    msgpack = None
+
+# Settings, overridable through DLD_* environment variables
+
+class Settings(BaseModel):
+    pool_workers: int = os.cpu_count() or 1  # 0 runs everything inline
+    pool_queue_limit: int = 32  # offloaded jobs allowed in flight before 503
+    coalesce: bool = True  # identical offloaded jobs in flight share one computation
+    coalesce_waiters: int = 1000  # requests allowed to wait on one shared computation before 503
+    convert_offload_digits: int = 20_000  # numbers at least this long go to the pool
+    binary_offload_bits: int = 4096  # operands at least this wide go to the pool
+    cache_entries: int = 4096  # per result cache; 0 disables caching
+    cache_bytes: int = 64 << 20  # approximate memory cap per result cache
+    shared_cache: str = ""  # path prefix of caches shared by all workers, e.g. /dev/shm/dld; "" disables
+    shared_cache_slots: int = 16384  # slots per shared cache file
+    shared_cache_slot_bytes: int = 4096  # per slot, a 32 byte header included; bigger entries are compressed
+    shared_cache_min_key_bytes: int = 512  # smaller inputs recompute faster than a shared lookup
+    small_tables: bool = True  # precomputed results for widths up to 8 bits
+    small_tables_threshold: int = 64  # lookups of one operation and width before its table builds
+    small_tables_eager: bool = False  # build every table in the background after startup
+    static_max_age: int = 0  # Cache-Control max-age of the frontend files; 0 always revalidates
+    session_limit: int = 10_000  # open /convert/ws sessions before new ones are refused
+    profile_sample_rate: float = 0.0  # fraction of requests run under cProfile
+    profile_header: str = "x-profile"  # requests whose header carries admin_token are profiled too; "" disables
+    profile_window: int = 200  # profiled requests kept for /admin/profile
+    admin_token: str = ""  # /admin/* and the profile header need it; both are off while unset
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        values = {}
+        for name in cls.model_fields:
+            raw = os.environ.get(f"DLD_{name.upper()}")
+            if raw is not None:
+                values[name] = raw
+        return cls(**values)
+
+settings = Settings.from_env()
+
+for _cache in (conversion_cache, operation_cache):
+    _cache.configure(settings.cache_entries, settings.cache_bytes)
+if settings.shared_cache:
+    # a change to the code computing the results empties the shared files
+    _tag = source_tag("module_1", "module_2", "bigint")
+    for _name, _cache, _encode, _decode in (
+            ("conversion", conversion_cache, encode_outcome, decode_outcome),
+            ("binary", operation_cache, ALUResult.encode, ALUResult.decode)):
+        _cache.backing = SharedCache(f"{settings.shared_cache}-{_name}", settings.shared_cache_slots,
+                                     settings.shared_cache_slot_bytes, _tag,
+                                     settings.shared_cache_min_key_bytes, _encode, _decode)
+small_tables.configure(settings.small_tables)
+profile = RollingProfile(settings.profile_window)
+
+# Metrics, served in Prometheus text format at /metrics
+
+registry = Registry()
+binary_latency = registry.histogram(
+    "dld_binary_operation_seconds", "Binary arithmetic latency",
+    ("representation", "operation", "width"))
+conversion_latency = registry.histogram(
+    "dld_conversion_seconds", "Base conversion latency",
+    ("from_base", "to_base", "length"))
+errors = registry.counter(
+    "dld_errors_total", "Failed conversions and operations by error kind",
+    ("endpoint", "kind"))
+in_flight = registry.gauge(
+    "dld_in_flight_requests", "Requests currently being handled", ("path",))
+coalesced = registry.counter(
+    "dld_coalesced_requests_total", "Requests answered by another request's computation",
+    ("function",))
+coalesce_rejected = registry.counter(
+    "dld_coalesce_rejected_total", "Requests refused because too many waited on one computation",
+    ("function",))
+shared_flights = registry.gauge(
+    "dld_shared_computations", "Offloaded computations in flight that others can join")
+startup_seconds = registry.gauge(
+    "dld_startup_seconds", "Time spent starting up, by phase", ("phase",))
+open_sessions = registry.gauge(
+    "dld_websocket_sessions", "Open /convert/ws sessions")
+
+def _base_label(base: int) -> str:
+    # bases come straight from the request, keep the label set bounded
+    return str(base) if 2 <= base <= 64 else "other"
+
+def _error_kind(result) -> str:
+    if result.overflow:
+        return "overflow"
+    if result.div_by_zero:
+        return "division_by_zero"
+    if result.error == "Underflow":
+        return "underflow"
+    if result.error == "Bad input" or result.error.startswith("Unsupported"):
+        return "bad_input"
+    return "other"
+
+# Execution policy: small jobs run inline on the event loop, large ones in
+# a process pool so they cannot stall other clients
+
+_pool = None
+_offloaded = 0
+_flights = {}  # cache key -> [task computing it, requests waiting on it]
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # imported here: multiprocessing is slow to import and often unused
+        from concurrent.futures import ProcessPoolExecutor
+        _pool = ProcessPoolExecutor(max_workers=settings.pool_workers)
+    return _pool
+
+def _call_in_worker(func, *args):
+    # HTTPException cannot be unpickled in the parent, so send it back as data
+    try:
+        return func(*args), None
+    except HTTPException as e:
+        return None, (e.status_code, e.detail)
+
+def _offloads(size: int, threshold: int) -> bool:
+    return settings.pool_workers > 0 and size >= threshold
+
+async def run_policy(size: int, threshold: int, func, *args):
+    global _offloaded, _pool
+    if not _offloads(size, threshold):
+        return func(*args)
+    if _offloaded >= settings.pool_queue_limit:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Server is busy, retry later",
+                            headers={"Retry-After": "1"})
+    # a profiled request's job is profiled in the worker, see profiling.py
+    elsewhere = profiling.get()
+    job = (_call_in_worker,) if elsewhere is None else (profile_call, _call_in_worker)
+    _offloaded += 1
+    try:
+        outcome = await asyncio.get_running_loop().run_in_executor(_get_pool(), *job, func, *args)
+    except BrokenExecutor:  # a worker died
+        _pool = None
+        raise
+    finally:
+        _offloaded -= 1
+    if elsewhere is not None:
+        outcome, stats = outcome
+        elsewhere.append(stats)
+    result, http_error = outcome
+    if http_error:
+        raise HTTPException(status_code=http_error[0], detail=http_error[1])
+    return result
+
+def _land(cache, key, task):
+    # a shared computation finished: cache its result, let new requests start over
+    del _flights[key]
+    shared_flights.dec()
+    if not task.cancelled() and task.exception() is None:
+        cache.put(key, task.result())
+
+async def cached_policy(cache, key, size: int, threshold: int, func, *args):
+    # look the result up (in this process, then in the shared cache if one
+    # is configured) before running (or offloading) func;
+    # an offloaded job already in flight for the same key is awaited, not rerun
+    value = cache.get(key)
+    if value is not None:
+        return value
+    if not settings.coalesce or not _offloads(size, threshold):
+        value = await run_policy(size, threshold, func, *args)
+        cache.put(key, value)
+        return value
+
+    flight = _flights.get(key)
+    if flight is None:
+        # its own task, so the request that started it can go away without
+        # cancelling it for everyone else
+        task = asyncio.ensure_future(run_policy(size, threshold, func, *args))
+        flight = _flights[key] = [task, 0]
+        shared_flights.inc()
+        task.add_done_callback(lambda done: _land(cache, key, done))
+    elif flight[1] >= settings.coalesce_waiters:
+        coalesce_rejected.inc((func.__name__,))
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Server is busy, retry later",
+                            headers={"Retry-After": "1"})
+    else:
+        flight[1] += 1
+        coalesced.inc((func.__name__,))
+    return await asyncio.shield(flight[0])
+
+# The frontend is served from memory; nothing else in the directory is
+assets = StaticAssets(os.path.dirname(os.path.abspath(__file__)), ("index.html", "app.js"),
+                      settings.static_max_age)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _pool
+    start = perf_counter()
+    assets.load()
+    # tables build in a thread, never on the event loop: all of them (~6s)
+    # when eager, otherwise each once its operation and width are in use
+    if settings.small_tables_eager:
+        threading.Thread(target=small_tables.build_all, name="small-tables", daemon=True).start()
+    elif settings.small_tables:
+        small_tables.start_builder(settings.small_tables_threshold)
+    startup_seconds.set(("lifespan",), perf_counter() - start)
+    yield
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None  # a restarted app gets a fresh pool from _get_pool
 
 app = FastAPI(
     title="DLD simulator",
     description="just a poor soul doing his assignments :(",
+    lifespan=lifespan,
 )
 
-app.mount("/static", StaticFiles(directory="."), name="static")
+@app.api_route("/", methods=["GET", "HEAD"])
+async def serve_frontend(request: Request):
+    return assets.response("index.html", request.headers)
 
-
-@app.get("/")
-async def serve_frontend():
-    return FileResponse("index.html")
+@app.api_route("/static/{name}", methods=["GET", "HEAD"])
+async def serve_static(name: str, request: Request):
+    return assets.response(name, request.headers)
 
 #Schemas 
 
@@ -28,6 +254,14 @@ class NumberConversion(BaseModel):
     number: str
     from_base: int
     to_base: int
+    exact: bool = False  # arbitrary-precision path instead of float
+    alphabet: str | None = None  # digit alphabet, needed for bases above 20
+    precision: int | None = None  # fractional digits to keep (exact), 6 by default
+    rounding: str | None = None  # "down", "up", "half_up", "half_even", "floor" or "ceiling"
+    repeating: bool = False  # write a repeating group as 0.(3) instead of cutting it off
+
+class BatchConversion(BaseModel):
+    items: list[NumberConversion]
 
 class BinaryOperation(BaseModel):
     binary1: str
@@ -35,160 +269,315 @@ class BinaryOperation(BaseModel):
     num_bits: int
     operation: str  # "add", "subtract", "multiply", "divide"
     representation: str = "unsigned"  # "unsigned", "signed", "ones_complement", "twos_complement"
+    encoding: str = "bits"  # or "hex"/"base64": big-endian bytes, ceil(num_bits / 8) per operand
+    result_encoding: str | None = None  # encoding of the results, the operands' by default
+
+class PackedOperation(BaseModel):
+    # MessagePack body of /binary/operation/packed, operands as raw bytes
+    binary1: bytes
+    binary2: bytes
+    num_bits: int
+    operation: str
+    representation: str = "unsigned"
 
 # Calling the api
 
+async def _conversion_outcome(conversion: NumberConversion) -> tuple:
+    args = (conversion.number, conversion.from_base, conversion.to_base,
+            conversion.alphabet or DIGITS, conversion.exact, fraction_request(conversion))
+    start = perf_counter()
+    # the fraction digits asked for cost about as much as input digits
+    size = len(conversion.number) + (conversion.precision or 0)
+    outcome = await cached_policy(conversion_cache, conversion_key(*args),
+                                  size, settings.convert_offload_digits,
+                                  conversion_outcome, *args)
+    conversion_latency.observe((_base_label(conversion.from_base), _base_label(conversion.to_base),
+                                size_bucket(len(conversion.number), LENGTH_BUCKETS)),
+                               perf_counter() - start)
+    if outcome[0] != "ok":
+        errors.inc(("convert", "bad_input"))
+    return outcome
+
 @app.post("/convert")
 async def convert_number(conversion: NumberConversion):
+    outcome = await _conversion_outcome(conversion)
     try:
-        return baseConverter(conversion)
+        return resolve_outcome(outcome)
     except ValueError as e:
         return {"error": str(e)}
 
+@app.post("/convert/batch")
+async def convert_batch(batch: BatchConversion):
+    size = sum(len(item.number) + (item.precision or 0) for item in batch.items)
+    results = await run_policy(size, settings.convert_offload_digits, batchConverter, batch.items)
+    return {"results": results}
+
+def _choices(names) -> str:
+    quoted = [f"'{name}'" for name in names]
+    return ", ".join(quoted[:-1]) + f", or {quoted[-1]}" if len(quoted) > 1 else quoted[0]
+
+def _validation_message(e: ValidationError) -> str:
+    error = e.errors()[0]
+    where = ".".join(str(part) for part in error["loc"])
+    return f"{where}: {error['msg']}" if where else error["msg"]
+
+OPERAND_ENCODINGS = ("bits", *PACKED_ENCODINGS)
+
+def _unknown_operation(operation) -> dict:
+    errors.inc(("binary_operation", "bad_input"))
+    if operation.representation.lower() not in REPRESENTATIONS:
+        return {"error": f"Invalid representation. Use {_choices(REPRESENTATION_NAMES)}"}
+    return {"error": f"Invalid operation. Use {_choices(dict.fromkeys(OPERATION_NAMES.values()))}"}
+
+async def _operation_result(entry, key_func, func, a, b, w: int):
+    # run (or look up) one operation on bit strings or packed bytes
+    args = (a, b, w, entry.representation.name, entry.name)
+    start = perf_counter()
+    result = await cached_policy(operation_cache, key_func(*args), w, settings.binary_offload_bits,
+                                 func, *args)
+    binary_latency.observe((entry.representation.name, entry.name, size_bucket(w, WIDTH_BUCKETS)),
+                           perf_counter() - start)
+    if result.error:
+        errors.inc(("binary_operation", _error_kind(result)))
+    return result
+
+async def _binary_response(operation: BinaryOperation) -> dict:
+    entry = resolve_operation(operation.representation, operation.operation)
+    if entry is None:
+        return _unknown_operation(operation)
+    result_encoding = operation.result_encoding or operation.encoding
+    if operation.encoding not in OPERAND_ENCODINGS or result_encoding not in OPERAND_ENCODINGS:
+        errors.inc(("binary_operation", "bad_input"))
+        return {"error": f"Invalid encoding. Use {_choices(OPERAND_ENCODINGS)}"}
+
+    if operation.encoding == "bits":
+        result = await _operation_result(entry, operation_key, compute_operation,
+                                         operation.binary1, operation.binary2, operation.num_bits)
+    else:
+        # decoded once here; the bytes are what gets cached and computed on
+        decode = PACKED_ENCODINGS[operation.encoding][0]
+        try:
+            a, b = decode(operation.binary1), decode(operation.binary2)
+        except ValueError:
+            errors.inc(("binary_operation", "bad_input"))
+            return entry.response(BAD_INPUT)
+        result = await _operation_result(entry, packed_key, compute_packed, a, b, operation.num_bits)
+    return entry.response(result, str if result_encoding == "bits" else packed_encoder(result_encoding))
+
 @app.post("/binary/operation")
 async def binary_operation(operation: BinaryOperation):
+    return await _binary_response(operation)
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+@app.post("/binary/operation/packed")
+async def binary_operation_packed(request: Request):
+    """MessagePack in and out: a PackedOperation map, with binary1/binary2
+    and the results as raw big-endian bytes (bin type)."""
+    if msgpack is None:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                            detail="MessagePack support needs the msgpack package")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in MSGPACK_TYPES:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail=f"Send the body as {MSGPACK_TYPES[0]}")
     try:
-        op = operation.operation.lower()
-        rep = operation.representation.lower()
-        
-        # Unsigned operations
-        if rep == "unsigned":
-            if op == "add":
-                result = binary_addition(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "unsigned addition",
-                    "result": result,
-                    "representation": "unsigned"
-                }
-            elif op == "subtract":
-                result = binary_subtraction(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "unsigned subtraction",
-                    "result": result,
-                    "representation": "unsigned"
-                }
-            elif op == "multiply":
-                result = binary_multiplication(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "unsigned multiplication",
-                    "result": result,
-                    "result_bits": len(result),
-                    "representation": "unsigned"
-                }
-            elif op == "divide":
-                quotient, remainder = binary_division(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "unsigned division",
-                    "quotient": quotient,
-                    "remainder": remainder,
-                    "representation": "unsigned"
-                }
-        
-        # Signed (sign-magnitude) operations
-        elif rep == "signed":
-            if op == "add":
-                result = signed_binary_addition(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "signed addition",
-                    "result": result,
-                    "representation": "sign-magnitude"
-                }
-            elif op == "subtract":
-                result = signed_binary_subtraction(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "signed subtraction",
-                    "result": result,
-                    "representation": "sign-magnitude"
-                }
-            elif op == "multiply":
-                result = signed_binary_multiplication(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "signed multiplication",
-                    "result": result,
-                    "result_bits": len(result),
-                    "representation": "sign-magnitude"
-                }
-            elif op == "divide":
-                quotient, remainder = signed_binary_division(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "signed division",
-                    "quotient": quotient,
-                    "remainder": remainder,
-                    "representation": "sign-magnitude"
-                }
-        
-        # 1's complement operations
-        elif rep == "ones_complement":
-            if op == "add":
-                result = ones_complement_addition(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "1's complement addition",
-                    "result": result,
-                    "representation": "1's complement"
-                }
-            elif op == "subtract":
-                result = ones_complement_subtraction(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "1's complement subtraction",
-                    "result": result,
-                    "representation": "1's complement"
-                }
-            elif op == "multiply":
-                result = ones_complement_multiplication(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "1's complement multiplication",
-                    "result": result,
-                    "result_bits": len(result),
-                    "representation": "1's complement"
-                }
-            elif op == "divide":
-                quotient, remainder = ones_complement_division(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "1's complement division",
-                    "quotient": quotient,
-                    "remainder": remainder,
-                    "representation": "1's complement"
-                }
-        
-        # 2's complement operations
-        elif rep == "twos_complement":
-            if op == "add":
-                result = twos_complement_addition(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "2's complement addition",
-                    "result": result,
-                    "representation": "2's complement"
-                }
-            elif op == "subtract":
-                result = twos_complement_subtraction(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "2's complement subtraction",
-                    "result": result,
-                    "representation": "2's complement"
-                }
-            elif op == "multiply":
-                result = twos_complement_multiplication(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "2's complement multiplication",
-                    "result": result,
-                    "result_bits": len(result),
-                    "representation": "2's complement"
-                }
-            elif op == "divide":
-                quotient, remainder = twos_complement_division(operation.binary1, operation.binary2, operation.num_bits)
-                return {
-                    "operation": "2's complement division",
-                    "quotient": quotient,
-                    "remainder": remainder,
-                    "representation": "2's complement"
-                }
-        
+        operation = PackedOperation.model_validate(msgpack.unpackb(await request.body()))
+    except ValidationError as e:
+        record = {"error": _validation_message(e)}
+    except ValueError:  # msgpack's unpack errors are ValueErrors
+        record = {"error": "Malformed MessagePack body"}
+    else:
+        entry = resolve_operation(operation.representation, operation.operation)
+        if entry is None:
+            record = _unknown_operation(operation)
         else:
-            return {"error": "Invalid representation. Use 'unsigned', 'signed', 'ones_complement', or 'twos_complement'"}
-        
-        return {"error": "Invalid operation. Use 'add', 'subtract', 'multiply', or 'divide'"}
-    except ValueError as e:
-        return {"error": str(e)}
+            result = await _operation_result(entry, packed_key, compute_packed,
+                                             operation.binary1, operation.binary2, operation.num_bits)
+            record = entry.response(result, packed_encoder())
+    return Response(msgpack.packb(record), media_type=MSGPACK_TYPES[0])
+
+# NDJSON streaming: one JSON record per line in, one result per line out,
+# in the same order, handled as the request body arrives
+
+async def _ndjson_lines(request: Request):
+    pending = b""
+    async for chunk in request.stream():
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+class NDJSONStreamingResponse(StreamingResponse):
+    # The body generator reads the request stream itself, so skip the
+    # disconnect listener StreamingResponse would otherwise run on the same
+    # receive channel; a disconnect still ends request.stream().
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+def _ndjson_stream(request: Request, model, handle) -> StreamingResponse:
+    async def body():
+        async for line in _ndjson_lines(request):
+            try:
+                record = await handle(model.model_validate_json(line))
+            except ValidationError as e:
+                record = {"error": _validation_message(e)}
+            except HTTPException as e:
+                record = {"error": e.detail}
+            yield json.dumps(record) + "\n"
+    return NDJSONStreamingResponse(body())
+
+async def _stream_conversion(conversion: NumberConversion) -> dict:
+    kind, value = await _conversion_outcome(conversion)
+    return {"result": value} if kind == "ok" else {"error": value}
+
+@app.post("/convert/stream")
+async def convert_stream(request: Request):
+    return _ndjson_stream(request, NumberConversion, _stream_conversion)
+
+@app.post("/binary/operation/stream")
+async def binary_operation_stream(request: Request):
+    return _ndjson_stream(request, BinaryOperation, _binary_response)
+
+# Live conversion over a WebSocket: the client sends keystrokes, the server
+# keeps the number in an IncrementalConverter and answers every message
+# with the number converted to each requested base
+
+class ConversionSession(BaseModel):
+    from_base: int
+    to_bases: list[int]
+    alphabet: str | None = None
+    precision: int | None = None
+    rounding: str | None = None
+    repeating: bool = False
+
+def _session_config(converter, message):
+    # the converter for a client message: a new one for a config, else the current one
+    if not isinstance(message, dict):
+        raise ValueError("Expected a JSON object")
+    if "config" in message:
+        config = ConversionSession.model_validate(message["config"])
+        converter = IncrementalConverter(config.from_base, config.to_bases,
+                                         config.alphabet or DIGITS, fraction_request(config))
+    if converter is None:
+        raise ValueError("Send a config message first")
+    return converter
+
+def _session_edit(converter, message) -> tuple:
+    # apply a message's edits, in the order clear, set, delete, append, and
+    # convert; long numbers do this in a pool worker, so the converter is
+    # sent there and back once per message.  Edits go to a copy (a few
+    # immutable slots), so a message that fails part way leaves the session
+    # as it was whether it ran inline or in the pool
+    converter = copy.copy(converter)
+    if message.get("clear"):
+        converter.clear()
+    for key, kind in (("set", str), ("delete", int), ("append", str)):
+        if key in message:
+            if type(message[key]) is not kind:
+                raise ValueError(f"'{key}' must be a {'string' if kind is str else 'number'}")
+            getattr(converter, key)(message[key])
+    results = converter.convert()
+    return converter, {"number": converter.number,
+                       "results": {str(base): value for base, value in results.items()}}
+
+@app.websocket("/convert/ws")
+async def convert_session(websocket: WebSocket):
+    """Messages are JSON objects such as
+    {"config": {"from_base": 10, "to_bases": [2, 16]}, "set": "12"},
+    {"append": "3"}, {"delete": 1} or {"clear": true}; each is answered
+    with {"number": ..., "results": {"2": ..., "16": ...}} or {"error": ...}."""
+    if open_sessions.series.get((), 0) >= settings.session_limit:
+        await websocket.close(code=1013)  # try again later
+        return
+    await websocket.accept()
+    open_sessions.inc()
+    converter = None
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+                converter = _session_config(converter, message)
+                size = converter.size + (converter.options[0] or 0)
+                size += sum(len(message[key]) for key in ("set", "append")
+                            if isinstance(message.get(key), str))
+                converter, reply = await run_policy(size, settings.convert_offload_digits,
+                                                    _session_edit, converter, message)
+            except ValidationError as e:
+                reply = {"error": _validation_message(e)}
+            except HTTPException as e:
+                reply = {"error": e.detail}
+            except ValueError as e:  # bad JSON or fraction options
+                reply = {"error": str(e)}
+            await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        open_sessions.dec()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    stats = {
+        "conversion": conversion_cache.stats(),
+        "binary_operation": operation_cache.stats(),
+        "small_tables": small_tables.stats(),
+    }
+    if settings.shared_cache:
+        stats["shared"] = {
+            "conversion": conversion_cache.backing.stats(),
+            "binary_operation": operation_cache.backing.stats(),
+        }
+    return stats
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# Admin: the rolling request profile, see profiling.py
+
+def _require_admin(request: Request):
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Admin endpoints are disabled; set DLD_ADMIN_TOKEN")
+    token = request.headers.get("x-admin-token", "")
+    if not secrets.compare_digest(token, settings.admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+@app.get("/admin/profile")
+async def admin_profile(request: Request, format: str = "text", sort: str = "cumulative",
+                        limit: int = 40, match: str = ""):
+    """format=text (pstats listing, match filters it by regex, e.g. module_2),
+    pstats (binary dump, load with pstats.Stats or snakeviz/flameprof) or
+    json (recent profiled requests)."""
+    _require_admin(request)
+    if format == "pstats":
+        return Response(profile.dump(), media_type="application/octet-stream",
+                        headers={"Content-Disposition": 'attachment; filename="dld.prof"'})
+    if format == "json":
+        return profile.summary()
+    if format != "text":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Format must be 'text', 'pstats', or 'json'")
+    try:
+        return PlainTextResponse(profile.text(sort, limit, match))
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown sort key '{sort}'")
+
+@app.delete("/admin/profile")
+async def clear_profile(request: Request):
+    _require_admin(request)
+    return {"cleared": profile.clear()}
+
+app.add_middleware(InFlightMiddleware, gauge=in_flight, routes=app.routes)
+app.add_middleware(ProfilerMiddleware, profile=profile, rate=settings.profile_sample_rate,
+                   header=settings.profile_header, token=settings.admin_token, exclude=("/admin",))
+
+startup_seconds.set(("import",), perf_counter() - _import_started)
 
 #Command to run the fastapi api "python main.py"
 
@@ -0,0 +1,172 @@
+# ================= metrics.py =================
+#  Minimal Prometheus-style metrics: counters, gauges and histograms kept in
+#  plain dicts and rendered in the text exposition format.  Recording is a
+#  dict lookup, a bisect and a few integer adds, cheap enough to leave on
+#  under load.  Updates happen on the event loop thread, so there are no
+#  locks; worker processes never record metrics.
+
+from bisect import bisect_left
+
+# Latency buckets in seconds, 50us .. 10s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+# Label buckets that keep operand sizes from exploding the number of series
+WIDTH_BUCKETS = (8, 16, 32, 64, 256, 1024, 4096, 16384, 65536)
+LENGTH_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+def size_bucket(size: int, bounds: tuple) -> str:
+    """Label for the smallest bound >= size, e.g. '64' or '+Inf'."""
+    index = bisect_left(bounds, size)
+    return str(bounds[index]) if index < len(bounds) else '+Inf'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class: a named family of series keyed by label values."""
+    __slots__ = ('name', 'help', 'labelnames', 'series')
+    kind = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.series = {}
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+
+class Counter(Metric):
+    __slots__ = ()
+    kind = 'counter'
+
+    def inc(self, labels: tuple = (), amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    __slots__ = ()
+    kind = 'gauge'
+
+    def inc(self, labels: tuple = (), amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def dec(self, labels: tuple = (), amount=1):
+        self.series[labels] = self.series.get(labels, 0) - amount
+
+    def set(self, labels: tuple, value):
+        self.series[labels] = value
+
+
+class Histogram(Metric):
+    """Each series is [count per bucket (non-cumulative)..., +Inf count, sum]."""
+    __slots__ = ('buckets',)
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        bounds = [repr(float(b)) for b in self.buckets] + ['+Inf']
+        for labels, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{le} {cumulative}')
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{plain} {_format_value(series[-1])}')
+            lines.append(f'{self.name}_count{plain} {cumulative}')
+        return lines
+
+
+class Registry:
+    __slots__ = ('metrics',)
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class InFlightMiddleware:
+    """ASGI middleware counting requests in progress per route template.
+
+    The response body counts as in flight too, so streaming endpoints stay
+    counted until their last line is sent.  Requests are labelled with the
+    path of the route that will handle them, the same one the router later
+    stores in scope['route'], so '/static/app.js' counts as '/static/{name}'.
+    Requests no route matches share the label 'other' to keep the number of
+    series bounded.
+    """
+    __slots__ = ('app', 'gauge', 'routes')
+
+    def __init__(self, app, gauge: Gauge, routes):
+        self.app = app
+        self.gauge = gauge
+        self.routes = routes
+
+    def _label(self, scope) -> str:
+        # Only the template matters, so the method check and path parameter
+        # conversion done by route.matches are skipped
+        path = scope['path']
+        for route in self.routes:
+            if route.path_regex.match(path):
+                return route.path
+        return 'other'
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        labels = (self._label(scope),)
+        self.gauge.inc(labels)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gauge.dec(labels)
+
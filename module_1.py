@@ -1,94 +1,126 @@
+import json
+from functools import lru_cache
+from math import gcd
+
 from fastapi import HTTPException, status
 
-# Convert char to value, skipping I and O
-def char_to_value(c):
-    c = c.upper()
-    if c.isdigit():
-        return ord(c) - ord('0')
-    if c in ('I', 'O'):
-        return -1
-    value = ord(c) - ord('A') + 10
-    if c > 'H':
-        value -= 1
-    if c > 'N':
-        value -= 1
-    return value
+from bigint import divmod_fast
+from cache import LRUCache
 
-# Convert value to char, skipping I and O
-def value_to_char(val):
-    if val < 10:
-        return chr(ord('0') + val)
-    letters = ['A','B','C','D','E','F','G','H','J','K',
-               'L','M','N','P','Q','R','S','T']
-    return letters[val - 10]
+# Digit alphabet shared by every base (I and O are skipped)
+DIGITS = '0123456789ABCDEFGHJKLMNPQRST'
 
-# Validate number in a base (2-20), allows 1 '.' and optional '-'
-def is_valid_number(num: str, base: int) -> bool:
-    if base < 2 or base > 20:
-        return False
+# Highest base served with the default alphabet
+MAX_BASE = 20
 
-    decimal_point_seen = False
-    i = 0
+# Marks a byte that is not a digit in DigitCodec.values
+INVALID = 0xFF
 
-    if num.startswith('-'):
-        i += 1
+# Characters int() understands, target of DigitCodec.to_standard
+_STANDARD = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
-    while i < len(num):
-        c = num[i].upper()
-        if c == '.':
-            if decimal_point_seen:
-                return False
-            decimal_point_seen = True
-            i += 1
-            continue
+# What may remain of a valid number once its digits are deleted
+_VALID_REST = ('', '.', '-', '-.')
 
-        if c in ('I', 'O'):
-            return False
+class DigitCodec:
+    """Precompiled digit tables for one base of an alphabet.
 
-        if c.isdigit():
-            value = int(c)
-        else:
-            value = ord(c) - ord('A') + 10
-            if c > 'H':
-                value -= 1
-            if c > 'N':
-                value -= 1
+    values is a 256-entry bytes.translate table (digit value or INVALID),
+    allowed the accepted digit characters, and to_standard a str.translate
+    table onto int()'s own digits (None above base 36).  Upper-case
+    alphabets also accept lower-case input, like the default one.
+    """
+    __slots__ = ('base', 'digits', 'values', 'allowed', 'to_standard', 'fold', '_strip')
+
+    def __init__(self, base: int, alphabet: str = DIGITS):
+        if (not alphabet.isascii() or len(set(alphabet)) != len(alphabet)
+                or '.' in alphabet or '-' in alphabet):
+            raise ValueError("Alphabet must be distinct ASCII characters other than '.' and '-'")
+        if base < 2 or base > len(alphabet):
+            raise ValueError(f"Base must be between 2 and {len(alphabet)} for this alphabet")
+        digits = alphabet[:base]
+        self.fold = fold = alphabet == alphabet.upper() and len(set(alphabet.lower())) == len(alphabet)
+        accepted = digits + digits.lower() if fold else digits
+
+        values = bytearray([INVALID]) * 256
+        for value, c in enumerate(digits):
+            values[ord(c)] = value
+            if fold:
+                values[ord(c.lower())] = value
+
+        self.base = base
+        self.digits = digits
+        self.values = bytes(values)
+        self.allowed = frozenset(accepted)
+        self.to_standard = None
+        if base <= len(_STANDARD):
+            self.to_standard = str.maketrans(accepted, ''.join(_STANDARD[values[ord(c)]] for c in accepted))
+        self._strip = str.maketrans('', '', accepted)
 
-        if value >= base:
-            return False
+    # One C-level pass: delete every digit and look at what is left
+    def is_valid(self, num: str) -> bool:
+        rest = num.translate(self._strip)
+        return bool(num) and rest in _VALID_REST and (not rest or rest[0] != '-' or num[0] == '-')
 
-        i += 1
+    # Validated text spelled with the alphabet's own digits (case folded)
+    def canonical(self, num: str) -> str:
+        return num.upper() if self.fold else num
 
-    return len(num) > 0
+    # Digit values of an already validated digit string, one byte each
+    def decode(self, digits: str) -> bytes:
+        return digits.encode('ascii').translate(self.values)
+
+# Alphabets come from clients, so the codec and regroup caches are bounded;
+# the default alphabet needs 27 codecs and 19 * 19 base pairs
+CODEC_CACHE_SIZE = 256
+REGROUP_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=CODEC_CACHE_SIZE)
+def get_codec(base: int, alphabet: str = DIGITS) -> DigitCodec:
+    return DigitCodec(base, alphabet)
+
+def base_limit(alphabet: str = DIGITS) -> int:
+    return MAX_BASE if alphabet == DIGITS else len(alphabet)
+
+_DEFAULT_VALUES = get_codec(len(DIGITS)).values
+
+# Convert char to value, skipping I and O (-1 for anything else)
+def char_to_value(c):
+    value = _DEFAULT_VALUES[ord(c)] if ord(c) < 256 else INVALID
+    return -1 if value == INVALID else value
+
+# Convert value to char, skipping I and O
+def value_to_char(val):
+    return DIGITS[val]
+
+# Validate number in a base (2-20), allows 1 '.' and optional '-'
+def is_valid_number(num: str, base: int) -> bool:
+    if base < 2 or base > MAX_BASE:
+        return False
+    return get_codec(base).is_valid(num)
 
 # Convert valid number from base to decimal (float)
-def base_to_decimal(num: str, base: int) -> float:
-    i = 0
-    negative = False
-    if num.startswith('-'):
-        negative = True
-        i += 1
+def base_to_decimal(num: str, base: int, codec: DigitCodec = None) -> float:
+    codec = codec or get_codec(base)
+    negative = num.startswith('-')
+    int_str, _, frac_str = num[negative:].partition('.')
 
     result = 0.0
     # integer part
-    while i < len(num) and num[i] != '.':
-        result = result * base + char_to_value(num[i])
-        i += 1
+    for value in codec.decode(int_str):
+        result = result * base + value
 
     # fractional part
-    if i < len(num) and num[i] == '.':
-        i += 1
-
     divisor = base
-    while i < len(num):
-        result += char_to_value(num[i]) / divisor
+    for value in codec.decode(frac_str):
+        result += value / divisor
         divisor *= base
-        i += 1
 
     return -result if negative else result
 
 # Convert decimal float to target base string (up to 6 fractional digits)
-def decimal_to_base(num: float, base: int) -> str:
+def decimal_to_base(num: float, base: int, codec: DigitCodec = None) -> str:
+    digits = (codec or get_codec(base)).digits
     output = ''
     if num < 0:
         output += '-'
@@ -98,38 +130,546 @@ def decimal_to_base(num: float, base: int) -> str:
     frac_part = num - int_part
 
     # integer part
-    if int_part == 0:
-        output += '0'
-    else:
-        int_buffer = ''
-        while int_part > 0:
-            remainder = int_part % base
-            int_buffer = value_to_char(remainder) + int_buffer
-            int_part //= base
-        output += int_buffer
+    int_digits = []
+    while int_part > 0:
+        int_part, remainder = divmod(int_part, base)
+        int_digits.append(digits[remainder])
+    output += ''.join(reversed(int_digits)) or digits[0]
 
     # fractional part
     if frac_part > 0:
-        output += '.'
+        frac_digits = []
         for _ in range(6):
             frac_part *= base
             digit = int(frac_part)
-            output += value_to_char(digit)
+            frac_digits.append(digits[digit])
             frac_part -= digit
             if frac_part < 1e-12:
                 break
+        output += '.' + ''.join(frac_digits)
+
+    return output
+
+# ---------------- power-related bases ----------------
+
+def _radix_exponent(base: int, radix: int) -> int:
+    # k with radix**k == base, or 0 if base is not a power of radix
+    k, power = 1, radix
+    while power < base:
+        power *= radix
+        k += 1
+    return k if power == base else 0
+
+def _radix_digits(value: int, radix: int, width: int, digits: str) -> str:
+    out = ''
+    for _ in range(width):
+        value, r = divmod(value, radix)
+        out = digits[r] + out
+    return out
+
+# Bases 2/4/8/16 (and 3/9) are powers of a common radix, so each digit maps
+# onto a fixed-size group of radix digits.  Returns None for unrelated bases,
+# otherwise the output group size plus the expand/collapse lookup tables.
+@lru_cache(maxsize=REGROUP_CACHE_SIZE)
+def regroup_tables(from_base: int, to_base: int, alphabet: str = DIGITS):
+    for radix in range(2, min(from_base, to_base) + 1):
+        p = _radix_exponent(from_base, radix)
+        q = _radix_exponent(to_base, radix)
+        if p and q:
+            break
+    else:
+        return None
+    source = get_codec(from_base, alphabet)
+    expand = {ord(c): _radix_digits(source.values[ord(c)], radix, p, alphabet)
+              for c in source.allowed}
+    collapse = {_radix_digits(v, radix, q, alphabet): alphabet[v] for v in range(to_base)}
+    return q, expand, collapse, alphabet[0]
+
+# Exact linear-time conversion between power-related bases
+def regroup_convert(num: str, tables) -> str:
+    q, expand, collapse, zero = tables
+    negative = num.startswith('-')
+    int_str, _, frac_str = num[negative:].partition('.')
+
+    int_digits = int_str.translate(expand).lstrip(zero)
+    frac_digits = frac_str.translate(expand).rstrip(zero)
+    int_digits = int_digits.rjust(-(-len(int_digits) // q) * q, zero)
+    frac_digits = frac_digits.ljust(-(-len(frac_digits) // q) * q, zero)
+
+    output = ''.join([collapse[int_digits[i:i + q]] for i in range(0, len(int_digits), q)]) or zero
+    if frac_digits:
+        output += '.' + ''.join([collapse[frac_digits[i:i + q]] for i in range(0, len(frac_digits), q)])
+    if negative and (int_digits or frac_digits):
+        output = '-' + output
+    return output
+
+# ---------------- exact (arbitrary precision) path ----------------
+
+# Digits handled by one leaf conversion in the exact path
+EXACT_LEAF = 512
+
+# base ** (EXACT_LEAF * 2**k), shared by parsing and formatting
+@lru_cache(maxsize=None)
+def _leaf_power(base: int, k: int) -> int:
+    if k == 0:
+        return base ** EXACT_LEAF
+    return _leaf_power(base, k - 1) ** 2
+
+# Exact value of a digit string: split off the low EXACT_LEAF * 2**k
+# digits and combine the halves with one big multiplication
+def exact_parse_digits(digits: str, base: int, codec: DigitCodec = None) -> int:
+    codec = codec or get_codec(base)
+    if codec.to_standard:
+        digits = digits.translate(codec.to_standard)
+        leaf = lambda lo, hi: int(digits[lo:hi] or '0', base)
+    else:
+        values = codec.decode(digits)
+
+        def leaf(lo, hi):
+            result = 0
+            for value in values[lo:hi]:
+                result = result * base + value
+            return result
+
+    def inner(lo, hi):
+        if hi - lo <= EXACT_LEAF:
+            return leaf(lo, hi)
+        k = ((hi - lo - 1) // EXACT_LEAF).bit_length() - 1
+        mid = hi - (EXACT_LEAF << k)
+        return inner(lo, mid) * _leaf_power(base, k) + inner(mid, hi)
+
+    return inner(0, len(digits))
+
+# Exact digits of a non-negative int: split on the remainder by
+# base ** (EXACT_LEAF * 2**k) and format both halves
+def exact_format_digits(n: int, base: int, codec: DigitCodec = None) -> str:
+    alphabet = (codec or get_codec(base)).digits
+
+    def leaf(x, width):
+        out = []
+        while x:
+            x, r = divmod(x, base)
+            out.append(alphabet[r])
+        return ''.join(reversed(out)).rjust(width, alphabet[0])
+
+    def inner(x, width):
+        # width == 0 marks the leading block, which is not zero padded
+        if width:
+            if width <= EXACT_LEAF:
+                return leaf(x, width)
+            k = ((width - 1) // EXACT_LEAF).bit_length() - 1
+        else:
+            if x < _leaf_power(base, 0):
+                return leaf(x, 0)
+            k = 0
+            while _leaf_power(base, k + 1) <= x:
+                k += 1
+        hi, lo = divmod_fast(x, _leaf_power(base, k))
+        size = EXACT_LEAF << k
+        return inner(hi, width - size if width else 0) + inner(lo, size)
 
+    return inner(n, 0) or alphabet[0]
+
+# ---------------- exact fractions ----------------
+
+# Rounding modes for the last kept fractional digit (decimal module names)
+ROUNDING_MODES = ('down', 'up', 'half_up', 'half_even', 'floor', 'ceiling')
+
+# Fractional digits kept when no precision is given
+LEGACY_FRACTION_DIGITS = 6
+
+# How far a repeating group is searched for when no precision is given
+REPEAT_SEARCH_DIGITS = 1000
+
+# Largest precision a request may ask for
+MAX_FRACTION_DIGITS = 100_000
+
+def fraction_request(data):
+    """(precision, rounding, repeating) from a request object, or None if unset."""
+    options = (getattr(data, 'precision', None), getattr(data, 'rounding', None),
+               bool(getattr(data, 'repeating', False)))
+    return None if options == (None, None, False) else options
+
+def fraction_options(precision=None, rounding=None, repeating=False) -> tuple:
+    """Validated (precision, rounding, repeating); precision None means the default."""
+    rounding = rounding or 'down'
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Rounding must be one of {', '.join(ROUNDING_MODES)}")
+    if precision is not None and not 0 <= precision <= MAX_FRACTION_DIGITS:
+        raise ValueError(f"Precision must be between 0 and {MAX_FRACTION_DIGITS}")
+    return (precision, rounding, bool(repeating))
+
+def _terminating_length(den: int, base: int):
+    # digits after which num/den (reduced) terminates in base, None if never
+    length = 0
+    while den != 1:
+        g = gcd(den, base)
+        if g == 1:
+            return None
+        den //= g
+        length += 1
+    return length
+
+def _rounds_up(rounding: str, rem: int, den: int, last_digit: int, negative: bool) -> bool:
+    # whether the discarded rem/den bumps the magnitude's last kept digit
+    if not rem or rounding == 'down':
+        return False
+    if rounding == 'up':
+        return True
+    if rounding == 'floor':
+        return negative
+    if rounding == 'ceiling':
+        return not negative
+    twice = 2 * rem
+    if rounding == 'half_up':
+        return twice >= den
+    return twice > den or (twice == den and last_digit % 2 == 1)
+
+def _repeating_digits(num: int, den: int, base: int, limit: int):
+    """Long division of num/den < 1 for at most limit digits.
+
+    Returns (digits, cycle start or None, remainder).  Every remainder is
+    indexed by the position it produced, so a repeat is found the moment
+    it happens and the whole search stays linear in the digits produced.
+    """
+    seen = {}
+    digits = []
+    while num and len(digits) < limit:
+        if num in seen:
+            return digits, seen[num], 0
+        seen[num] = len(digits)
+        digit, num = divmod(num * base, den)
+        digits.append(digit)
+    if num in seen:
+        return digits, seen[num], 0
+    return digits, None, num
+
+def _exact_convert(num: str, source: DigitCodec, target: DigitCodec, precision: int = None,
+                   rounding: str = 'down', repeating: bool = False) -> str:
+    """Convert through exact integers, the fraction as a reduced num/den.
+
+    Up to precision fractional digits are produced (6 by default), the
+    rest rounded away.  With repeating, a repeating group found within
+    that precision is written in parentheses, e.g. 0.(3), and not rounded.
+    """
+    negative = num.startswith('-')
+    int_str, _, frac_str = num[negative:].partition('.')
+    int_part = exact_parse_digits(int_str, source.base, source)
+    frac_num = exact_parse_digits(frac_str, source.base, source)
+    return _format_exact(negative, int_part, frac_num, source.base ** len(frac_str), target,
+                         precision, rounding, repeating)
+
+def _format_exact(negative: bool, int_part: int, frac_num: int, frac_den: int, target: DigitCodec,
+                  precision: int = None, rounding: str = 'down', repeating: bool = False) -> str:
+    # digits of -/+ (int_part + frac_num / frac_den) in target's base
+    base = target.base
+    g = gcd(frac_num, frac_den)
+    frac_num, frac_den = frac_num // g, frac_den // g
+    nonzero = int_part or frac_num
+    if precision is None:
+        precision = REPEAT_SEARCH_DIGITS if repeating else LEGACY_FRACTION_DIGITS
+
+    cycle = None
+    length = _terminating_length(frac_den, base)
+    if length is not None and length <= precision:
+        frac, rem = frac_num * base ** length // frac_den, 0
+    elif repeating:
+        digits, cycle, rem = _repeating_digits(frac_num, frac_den, base, precision)
+        length = len(digits)
+        frac = exact_parse_digits(''.join(target.digits[d] for d in digits), base, target) if digits else 0
+    else:
+        length = precision
+        frac, rem = divmod(frac_num * base ** length, frac_den)
+
+    last_digit = frac % base if length else int_part % base
+    if _rounds_up(rounding, rem, frac_den, last_digit, negative):
+        frac += 1
+        if frac == base ** length:
+            frac = 0
+            int_part += 1
+
+    output = exact_format_digits(int_part, base, target)
+    if length:
+        frac_digits = exact_format_digits(frac, base, target).rjust(length, target.digits[0])
+        if cycle is not None:
+            frac_digits = f'{frac_digits[:cycle]}({frac_digits[cycle:]})'
+        output += '.' + frac_digits
+    if negative and nonzero:
+        output = '-' + output
     return output
 
+def _convert_valid(num: str, source: DigitCodec, target: DigitCodec, tables, exact: bool,
+                   options: tuple) -> str:
+    # convert a number already checked against its source base
+    if tables and (options is None or options[0] is None):
+        return regroup_convert(num, tables)
+    if options is not None:
+        return _exact_convert(num, source, target, *options)
+    if exact:
+        return _exact_convert(num, source, target)
+    return decimal_to_base(base_to_decimal(num, source.base, source), target.base, target)
+
+# ---------------- converters ----------------
+
+def _not_compatible():
+    return HTTPException(status_code= status.HTTP_409_CONFLICT, detail="Entered number is not comatible with base")
+
+def _bad_target(limit: int):
+    return HTTPException(status_code= status.HTTP_409_CONFLICT, detail=f"Target base must be between 2 and {limit}")
+
+# decimal_to_base raises OverflowError once the float path overflows to inf
+_TOO_LARGE = "Number is too large to convert without exact"
+
+# Validate and convert one number with the codecs of its base pair
+def _convert(num: str, base1: int, base2: int, alphabet: str, exact: bool,
+             fraction: tuple = None) -> str:
+    limit = base_limit(alphabet)
+    if base1 < 2 or base1 > limit:
+        raise _not_compatible()
+    source = get_codec(base1, alphabet)
+    if not source.is_valid(num):
+        raise _not_compatible()
+    if base2 < 2 or base2 > limit:
+        raise _bad_target(limit)
+    target = get_codec(base2, alphabet)
+    options = fraction_options(*fraction) if fraction else None
+    return _convert_valid(num, source, target, regroup_tables(base1, base2, alphabet), exact, options)
+
+# Results (and errors) of baseConverter, keyed by conversion_key
+conversion_cache = LRUCache()
+
+def conversion_key(num: str, base1: int, base2: int, alphabet: str = DIGITS, exact: bool = False,
+                   fraction: tuple = None) -> tuple:
+    """Cache key under which equivalent inputs convert identically.
+
+    Valid numbers are case-folded when the alphabet is, and leading zeros
+    of the integer part are dropped (keeping one, so '0' and '' stay apart).
+    Anything else is keyed on its raw text: stripping '0-1' would turn it
+    into the valid '-1' and the two would share one cached answer.
+    """
+    try:
+        codec = get_codec(base1, alphabet)
+    except ValueError:
+        return (num, base1, base2, alphabet, exact, fraction)
+    if not codec.is_valid(num):
+        return (num, base1, base2, alphabet, exact, fraction)
+    num = codec.canonical(num)
+    sign = '-' if num.startswith('-') else ''
+    int_str, dot, frac_str = num[len(sign):].partition('.')
+    zero = alphabet[0]
+    int_str = int_str.lstrip(zero) or int_str[:1]
+    return (sign + int_str + dot + frac_str, base1, base2, alphabet, exact, fraction)
+
+def conversion_outcome(num: str, base1: int, base2: int, alphabet: str = DIGITS, exact: bool = False,
+                       fraction: tuple = None) -> tuple:
+    """Uncached conversion returning ('ok', result) or (error kind, message),
+    a picklable form that can be cached or sent back from a worker."""
+    try:
+        return ('ok', _convert(num, base1, base2, alphabet, exact, fraction))
+    except HTTPException as e:
+        return ('conflict', e.detail)
+    except ValueError as e:  # bad alphabet or fraction options
+        return ('value', str(e))
+    except OverflowError:
+        return ('value', _TOO_LARGE)
+
+def encode_outcome(outcome: tuple) -> bytes:
+    # JSON for caches shared between processes: plain data, never code
+    return json.dumps(outcome, separators=(',', ':')).encode()
+
+def decode_outcome(data: bytes) -> tuple:
+    return tuple(json.loads(data))
+
+def resolve_outcome(outcome: tuple) -> str:
+    kind, value = outcome
+    if kind == 'conflict':
+        raise HTTPException(status_code= status.HTTP_409_CONFLICT, detail=value)
+    if kind == 'value':
+        raise ValueError(value)
+    return value
+
 def baseConverter(data):
-    
+
     num = data.number
     base1 = int(data.from_base)
     base2 = int(data.to_base)
+    alphabet = getattr(data, 'alphabet', None) or DIGITS
+    exact = getattr(data, 'exact', False)
+    fraction = fraction_request(data)
+
+    # errors are cached too, so bad inputs skip validation next time
+    key = conversion_key(num, base1, base2, alphabet, exact, fraction)
+    outcome = conversion_cache.get(key)
+    if outcome is None:
+        outcome = conversion_outcome(num, base1, base2, alphabet, exact, fraction)
+        conversion_cache.put(key, outcome)
+    return resolve_outcome(outcome)
+
+def exactConverter(num: str, base1: int, base2: int, alphabet: str = DIGITS,
+                   precision: int = None, rounding: str = None, repeating: bool = False) -> str:
+    """Convert without going through float; the integer part is exact and
+    the fraction keeps the same 6 truncated digits as decimal_to_base
+    unless precision, rounding or repeating say otherwise.  Power-related
+    bases are regrouped, which keeps the whole fraction, unless a
+    precision is given."""
+    fraction = (precision, rounding, repeating)
+    return _convert(num, base1, base2, alphabet, True,
+                    None if fraction == (None, None, False) else fraction)
+
+def batchConverter(items) -> list[dict]:
+    """Convert many numbers at once, returning one result or error per item.
+
+    Items are grouped by base pair and alphabet so each group shares one
+    set of codecs and regroup tables; the output keeps the input order.
+    """
+    groups = {}
+    for index, item in enumerate(items):
+        key = (int(item.from_base), int(item.to_base),
+               getattr(item, 'alphabet', None) or DIGITS, getattr(item, 'exact', False),
+               fraction_request(item))
+        groups.setdefault(key, []).append((index, item.number))
+
+    results = [None] * len(items)
+    for (base1, base2, alphabet, exact, fraction), entries in groups.items():
+        try:
+            # resolve the pair once; a bad pair fails every entry in the group
+            limit = base_limit(alphabet)
+            if base1 < 2 or base1 > limit:
+                raise _not_compatible()
+            source = get_codec(base1, alphabet)
+            target = get_codec(base2, alphabet) if 2 <= base2 <= limit else None
+            tables = regroup_tables(base1, base2, alphabet) if target else None
+            options = fraction_options(*fraction) if fraction else None
+        except (HTTPException, ValueError) as e:
+            error = {"error": getattr(e, 'detail', None) or str(e)}
+            for index, _ in entries:
+                results[index] = error
+            continue
+
+        for index, num in entries:
+            if not source.is_valid(num):
+                results[index] = {"error": "Entered number is not comatible with base"}
+            elif target is None:
+                results[index] = {"error": f"Target base must be between 2 and {limit}"}
+            else:
+                try:
+                    results[index] = {"result": _convert_valid(num, source, target, tables, exact, options)}
+                except OverflowError:
+                    results[index] = {"error": _TOO_LARGE}
+    return results
+
+# ---------------- incremental conversion ----------------
+
+class IncrementalConverter:
+    """A number typed one character at a time, converted to several bases.
+
+    The integer part and the fraction's numerator/denominator are kept as
+    ints, so appending a digit is one multiply-add and deleting one a
+    divide by the base: the number is never re-parsed.  Only the outputs
+    are formatted again, by convert().  The typed text itself is kept too
+    (number).  Results match exactConverter with the same options.
+    """
+    __slots__ = ('source', 'targets', 'options', 'number', 'negative', 'point',
+                 'int_part', 'int_len', 'frac_num', 'frac_den', 'frac_len')
+
+    def __init__(self, base: int, targets, alphabet: str = DIGITS, fraction: tuple = None):
+        limit = base_limit(alphabet)
+        if base < 2 or base > limit:
+            raise _not_compatible()
+        for target in targets:
+            if target < 2 or target > limit:
+                raise _bad_target(limit)
+        self.source = get_codec(base, alphabet)
+        # (codec, regrouped) per target; power-related pairs keep the whole fraction
+        self.targets = tuple((get_codec(target, alphabet), regroup_tables(base, target, alphabet) is not None)
+                             for target in dict.fromkeys(targets))
+        self.options = fraction_options(*fraction) if fraction else (None, 'down', False)
+        self.clear()
+
+    def clear(self):
+        self.number = ''  # the number typed so far, leading and trailing zeros included
+        self.negative = self.point = False
+        self.int_part = self.int_len = 0
+        self.frac_num = self.frac_len = 0
+        self.frac_den = 1
+
+    @property
+    def size(self) -> int:
+        return self.int_len + self.frac_len
+
+    def append(self, chars: str):
+        """Type chars after the current number; nothing changes if any is invalid."""
+        if len(chars) > EXACT_LEAF:
+            # a long paste is cheaper to parse in one go than digit by digit
+            return self.set(self.number + chars)
+        base, values = self.source.base, self.source.values
+        negative, point = self.negative, self.point
+        int_part, int_len = self.int_part, self.int_len
+        frac_num, frac_den, frac_len = self.frac_num, self.frac_den, self.frac_len
+        for c in chars:
+            value = values[ord(c)] if ord(c) < 256 else INVALID
+            if value != INVALID:
+                if point:
+                    frac_num, frac_den, frac_len = frac_num * base + value, frac_den * base, frac_len + 1
+                else:
+                    int_part, int_len = int_part * base + value, int_len + 1
+            elif c == '.' and not point:
+                point = True
+            elif c == '-' and not (negative or point or int_len):
+                negative = True
+            else:
+                raise _not_compatible()
+        self.number += self.source.canonical(chars)
+        self.negative, self.point = negative, point
+        self.int_part, self.int_len = int_part, int_len
+        self.frac_num, self.frac_den, self.frac_len = frac_num, frac_den, frac_len
+
+    def delete(self, count: int = 1):
+        """Remove up to count characters from the end, like backspace."""
+        base = self.source.base
+        for removed in range(count):
+            if self.frac_len:
+                self.frac_num //= base
+                self.frac_den //= base
+                self.frac_len -= 1
+            elif self.point:
+                self.point = False
+            elif self.int_len:
+                self.int_part //= base
+                self.int_len -= 1
+            elif self.negative:
+                self.negative = False
+            else:
+                break
+        else:
+            removed = count
+        self.number = self.number[:len(self.number) - removed]
 
-    if not is_valid_number(num, base1):
-        raise HTTPException(status_code= status.HTTP_409_CONFLICT, detail="Entered number is not comatible with base")
+    def set(self, num: str):
+        """Replace the whole number, parsed in one go (e.g. a paste)."""
+        source = self.source
+        if num and not source.is_valid(num):
+            raise _not_compatible()
+        self.clear()
+        self.negative = num.startswith('-')
+        int_str, dot, frac_str = num[self.negative:].partition('.')
+        self.point = bool(dot)
+        self.int_part, self.int_len = exact_parse_digits(int_str, source.base, source), len(int_str)
+        self.frac_num, self.frac_len = exact_parse_digits(frac_str, source.base, source), len(frac_str)
+        self.frac_den = source.base ** len(frac_str)
+        self.number = source.canonical(num)
 
-    decimal_value = base_to_decimal(num, base1)
-    result = decimal_to_base(decimal_value, base2)
-    return result
+    def convert(self) -> dict[int, str]:
+        """The current number in every target base ({} while nothing is typed)."""
+        if not self.size:
+            return {}
+        precision, rounding, repeating = self.options
+        results = {}
+        for target, regrouped in self.targets:
+            digits = precision
+            if digits is None and regrouped:
+                # enough digits for any fraction that terminates in target
+                digits = self.frac_len * self.source.base.bit_length()
+            results[target.base] = _format_exact(self.negative, self.int_part, self.frac_num, self.frac_den,
+                                                 target, digits, rounding, repeating)
+        return results
@@ -1,246 +1,964 @@
 # ================= module_2.py =================
-#  All functions below perform arithmetic **without converting
-#  whole binary strings to integers**.
+#  Arithmetic is carried out on BitVector, a fixed-width value packed
+#  into a single masked Python int.  The string functions at the bottom
+#  are thin wrappers that parse '0'/'1' operands once, run the
+#  BitVector operation and format the result back to a bit string.
+#  Callers that pick the operation at runtime (the API, test_runner)
+#  resolve it through the operation registry in section 1b.  Operands
+#  that arrive as packed bytes skip the bit strings altogether (1d).
+#  Very wide operands multiply and divide through bigint's Toom-3 and
+#  Burnikel-Ziegler routines; narrow ones use the builtin int operators.
+
+import base64
+import json
+from array import array
+from queue import SimpleQueue
+from threading import Thread
+from time import perf_counter
+
+from bigint import divmod_fast, mul_fast
+from cache import LRUCache, approx_size
+
+# --------------------------------------------------
+# 1.  BitVector engine
+# --------------------------------------------------
+class BitVector:
+    """Fixed-width bit pattern stored as a masked int plus its width."""
+    __slots__ = ('value', 'width')
+
+    def __init__(self, value: int, width: int):
+        self.value = value & ((1 << width) - 1)
+        self.width = width
+
+    @classmethod
+    def from_str(cls, bits: str) -> 'BitVector':
+        return cls(int(bits, 2) if bits else 0, len(bits))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, width: int) -> 'BitVector':
+        # big-endian, exactly ceil(width / 8) bytes with the padding bits clear
+        value = int.from_bytes(data, 'big')
+        if len(data) != (width + 7) // 8 or value >> width:
+            raise ValueError('Bad input')
+        return cls(value, width)
+
+    def to_bytes(self) -> bytes:
+        return self.value.to_bytes((self.width + 7) // 8, 'big')
+
+    def __str__(self) -> str:
+        if not self.width:
+            return ''
+        return format(self.value, '0%db' % self.width)
+
+    def __repr__(self) -> str:
+        return 'BitVector(%r)' % str(self)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BitVector):
+            return NotImplemented
+        return self.value == other.value and self.width == other.width
+
+    __hash__ = None
+
+    # ---- bit helpers ----
+    @property
+    def mask(self) -> int:
+        return (1 << self.width) - 1
+
+    @property
+    def sign(self) -> int:
+        return self.value >> (self.width - 1)
+
+    @property
+    def magnitude(self) -> int:
+        # low width-1 bits, i.e. everything below the sign bit
+        return self.value & (self.mask >> 1)
+
+    def invert(self) -> 'BitVector':
+        return BitVector(~self.value, self.width)
+
+    def negate(self) -> 'BitVector':
+        return BitVector(-self.value, self.width)
+
+    def to_signed(self) -> int:
+        return self.value - (self.sign << self.width)
+
+    # ---- unsigned ----
+    def add(self, other: 'BitVector') -> 'ALUResult':
+        s = self.value + other.value
+        carry = bool(s >> self.width)
+        if carry:
+            return ALUResult(error='Overflow', carry=True, overflow=True)
+        return ALUResult(BitVector(s, self.width), signed=False)
+
+    def sub(self, other: 'BitVector') -> 'ALUResult':
+        if other.value > self.value:
+            # borrow out of the top bit
+            return ALUResult(error='Underflow', carry=True)
+        return ALUResult(BitVector(self.value - other.value, self.width), signed=False)
+
+    def mul(self, other: 'BitVector') -> 'ALUResult':
+        return ALUResult(BitVector(mul_fast(self.value, other.value), 2 * self.width), signed=False)
+
+    def div(self, other: 'BitVector') -> 'ALUResult':
+        if not other.value:
+            return ALUResult(error='Division by zero', div_by_zero=True)
+        q, r = divmod_fast(self.value, other.value)
+        return ALUResult(BitVector(q, self.width), BitVector(r, self.width), signed=False)
+
+    # ---- sign-magnitude ----
+    def sm_add(self, other: 'BitVector') -> 'ALUResult':
+        w = self.width
+        sa, ma = self.sign, self.magnitude
+        sb, mb = other.sign, other.magnitude
+        if sa == sb:
+            mag = ma + mb
+            if mag >> (w - 1):
+                return ALUResult(error='Signed magnitude overflow', carry=True, overflow=True)
+            return ALUResult(BitVector(sa << (w - 1) | mag, w))
+        if ma > mb:
+            return ALUResult(BitVector(sa << (w - 1) | (ma - mb), w))
+        if ma < mb:
+            return ALUResult(BitVector(sb << (w - 1) | (mb - ma), w))
+        return ALUResult(BitVector(0, w))
+
+    def sm_sub(self, other: 'BitVector') -> 'ALUResult':
+        flipped = BitVector(other.value ^ (1 << (other.width - 1)), other.width)
+        return self.sm_add(flipped)
+
+    def sm_mul(self, other: 'BitVector') -> 'ALUResult':
+        w = 2 * self.width - 1
+        sign = self.sign ^ other.sign
+        return ALUResult(BitVector(sign << (w - 1) | mul_fast(self.magnitude, other.magnitude), w))
+
+    def sm_div(self, other: 'BitVector') -> 'ALUResult':
+        w = self.width
+        if not other.magnitude:
+            return ALUResult(error='Division by zero', div_by_zero=True)
+        q, r = divmod_fast(self.magnitude, other.magnitude)
+        q_sign = self.sign ^ other.sign
+        return ALUResult(BitVector(q_sign << (w - 1) | q, w),
+                         BitVector(self.sign << (w - 1) | r, w))
+
+    # ---- 1's complement ----
+    def oc_add(self, other: 'BitVector') -> 'ALUResult':
+        w = self.width
+        s = self.value + other.value
+        carry = bool(s >> w)
+        if carry:
+            s += 1  # end-around carry
+        res = BitVector(s, w)
+        if self.sign == other.sign and res.sign != self.sign:
+            return ALUResult(error='1\'s complement overflow', carry=carry, overflow=True)
+        return ALUResult(res, carry=carry)
+
+    def oc_sub(self, other: 'BitVector') -> 'ALUResult':
+        return self.oc_add(other.invert())
+
+    def _oc_magnitude(self) -> int:
+        m = self.magnitude
+        return m ^ (self.mask >> 1) if self.sign else m
+
+    def oc_mul(self, other: 'BitVector') -> 'ALUResult':
+        w = 2 * self.width - 1
+        mag = mul_fast(self._oc_magnitude(), other._oc_magnitude())
+        if self.sign != other.sign:
+            return ALUResult(BitVector(~mag, w))
+        return ALUResult(BitVector(mag, w))
+
+    def oc_div(self, other: 'BitVector') -> 'ALUResult':
+        w = self.width
+        if not other.value or other.value == self.mask:
+            return ALUResult(error='Division by zero', div_by_zero=True)
+        q, r = divmod_fast(self._oc_magnitude(), other._oc_magnitude())
+        if self.sign != other.sign:
+            q = ~q
+        if self.sign:
+            r = ~r
+        return ALUResult(BitVector(q, w), BitVector(r, w))
+
+    # ---- 2's complement ----
+    def tc_add(self, other: 'BitVector') -> 'ALUResult':
+        s = self.value + other.value
+        carry = bool(s >> self.width)
+        res = BitVector(s, self.width)
+        if self.sign == other.sign and res.sign != self.sign:
+            return ALUResult(error='2\'s complement overflow', carry=carry, overflow=True)
+        return ALUResult(res, carry=carry)
+
+    def tc_sub(self, other: 'BitVector') -> 'ALUResult':
+        if other.value == 1 << (other.width - 1):
+            return ALUResult(error='2\'s complement subtraction error')
+        return self.tc_add(other.negate())
+
+    def tc_mul(self, other: 'BitVector') -> 'ALUResult':
+        return ALUResult(BitVector(mul_fast(self.to_signed(), other.to_signed()), 2 * self.width))
+
+    def tc_div(self, other: 'BitVector') -> 'ALUResult':
+        w = self.width
+        if not other.value:
+            return ALUResult(error='Division by zero', div_by_zero=True)
+        if self.value == 1 << (w - 1) and other.value == self.mask:
+            return ALUResult(error='2\'s complement division overflow', overflow=True)
+        a, b = self.to_signed(), other.to_signed()
+        q, r = divmod_fast(abs(a), abs(b))
+        if (a < 0) != (b < 0):
+            q = -q
+        if a < 0:
+            r = -r
+        return ALUResult(BitVector(q, w), BitVector(r, w))
+
+
+class ALUResult:
+    """Outcome of one operation, reported like an ALU status register.
+
+    value/remainder are None when the operation failed, in which case
+    error holds the message the raising functions use.  carry is the carry
+    (or borrow) out of the top bit, zero means every result bit is 0 and
+    negative is the result's sign bit (always False for unsigned).
+    """
+    __slots__ = ('value', 'remainder', 'carry', 'overflow', 'zero', 'negative',
+                 'div_by_zero', 'error')
+
+    def __init__(self, value: BitVector = None, remainder: BitVector = None,
+                 carry: bool = False, overflow: bool = False, div_by_zero: bool = False,
+                 error: str = None, signed: bool = True):
+        self.value = value
+        self.remainder = remainder
+        self.carry = carry
+        self.overflow = overflow
+        self.div_by_zero = div_by_zero
+        self.error = error
+        self.zero = value is not None and not value.value
+        self.negative = signed and value is not None and value.width > 0 and bool(value.sign)
+
+    def __repr__(self) -> str:
+        if self.error:
+            return 'ALUResult(error=%r)' % self.error
+        return 'ALUResult(%s, %s)' % (self.value, self.remainder)
+
+    def unwrap(self):
+        # the raising API's return value: a bit string or (quotient, remainder)
+        if self.error:
+            raise ValueError(self.error)
+        if self.remainder is not None:
+            return str(self.value), str(self.remainder)
+        return str(self.value)
+
+    def encode(self) -> bytes:
+        # JSON for caches shared between processes: plain data, never code.
+        # Ints go as hex, which int() parses back at any length
+        vectors = [None if v is None else [format(v.value, 'x'), v.width] for v in (self.value, self.remainder)]
+        return json.dumps([*vectors, self.carry, self.overflow, self.zero, self.negative,
+                           self.div_by_zero, self.error], separators=(',', ':')).encode()
+
+    @classmethod
+    def decode(cls, data: bytes) -> 'ALUResult':
+        value, remainder, *flags, error = json.loads(data)
+        result = object.__new__(cls)
+        result.value, result.remainder = [None if v is None else BitVector(int(v[0], 16), v[1])
+                                          for v in (value, remainder)]
+        result.carry, result.overflow, result.zero, result.negative, result.div_by_zero = flags
+        result.error = error
+        return result
+
+
+BAD_INPUT = ALUResult(error='Bad input')
+
+# --------------------------------------------------
+# 1b. Operation registry
+# --------------------------------------------------
+#  Every (representation, operation) pair is registered once with its
+#  BitVector method; aliases ('sub', 'signed_magnitude', ...) resolve to
+#  the same Operation through one dict lookup.  A new representation
+#  plugs in with register_representation plus one register_operation
+#  per supported operation.
+
+class Representation:
+    """A number representation; prefix names its operations, label is reported."""
+    __slots__ = ('name', 'prefix', 'label', 'min_width')
+
+    def __init__(self, name: str, prefix: str, label: str, min_width: int):
+        self.name = name
+        self.prefix = prefix
+        self.label = label
+        self.min_width = min_width
+
+
+class Operation:
+    """A registered (representation, operation) pair and its response template."""
+    __slots__ = ('representation', 'name', 'key', 'label', 'method', 'function', 'template')
+
+    def __init__(self, representation: Representation, name: str, method, function, template: dict):
+        self.representation = representation
+        self.name = name
+        self.key = f'{representation.name}/{name}'
+        self.label = template['operation']
+        self.method = method
+        self.function = function  # raising string API: (a, b, w) -> str or (q, r)
+        self.template = template
+
+    def __repr__(self) -> str:
+        return 'Operation(%s)' % self.key
+
+    def response(self, result: ALUResult, encode=str) -> dict:
+        # API response dict, keys in the template's order; encode formats
+        # each BitVector (a bit string unless a packed encoding is asked for)
+        if result.error:
+            return {'error': result.error}
+        response = self.template.copy()
+        if 'quotient' in response:
+            response['quotient'] = encode(result.value)
+            response['remainder'] = encode(result.remainder)
+        else:
+            response['result'] = encode(result.value)
+            if 'result_bits' in response:
+                response['result_bits'] = result.value.width
+        return response
+
+
+REPRESENTATIONS = {}      # name or alias -> Representation
+REPRESENTATION_NAMES = []  # canonical names, in registration order
+OPERATION_NAMES = {}      # name or alias -> canonical operation name
+_OPERATION_KINDS = {}     # canonical operation name -> (label, result fields)
+OPERATIONS = {}           # (representation alias, operation alias) -> Operation
+
+
+def register_operation_name(name: str, label: str, aliases: tuple = (), fields: tuple = ('result',)):
+    """Declare an operation name, e.g. ('subtract', 'subtraction', ('sub',))."""
+    _OPERATION_KINDS[name] = (label, fields)
+    for alias in (name, *aliases):
+        OPERATION_NAMES[alias] = name
+
+
+def register_representation(name: str, prefix: str, label: str = None, min_width: int = 0,
+                            aliases: tuple = ()) -> Representation:
+    """Declare a representation; operands narrower than min_width are bad input."""
+    representation = Representation(name, prefix, label or prefix, min_width)
+    REPRESENTATION_NAMES.append(name)
+    for alias in (name, *aliases):
+        REPRESENTATIONS[alias] = representation
+    return representation
+
+
+def register_operation(representation: str, operation: str, method, function=None) -> Operation:
+    """Register method(BitVector, BitVector) -> ALUResult under every alias pair.
+
+    function is the raising string API; one is built from method if omitted.
+    """
+    rep = REPRESENTATIONS[representation]
+    name = OPERATION_NAMES[operation]
+    label, fields = _OPERATION_KINDS[name]
+    template = {'operation': f'{rep.prefix} {label}'}
+    template.update(dict.fromkeys(fields))
+    template['representation'] = rep.label
+    entry = Operation(rep, name, method, None, template)
+    entry.function = function or (lambda a, b, w: _execute(entry, a, b, w).unwrap())
+    rep_aliases = [alias for alias, r in REPRESENTATIONS.items() if r is rep]
+    op_aliases = [alias for alias, n in OPERATION_NAMES.items() if n == name]
+    for rep_alias in rep_aliases:
+        for op_alias in op_aliases:
+            OPERATIONS[(rep_alias, op_alias)] = entry
+    return entry
+
+
+def resolve_operation(representation: str, operation: str) -> Operation:
+    """Operation registered for the pair (any alias, any case), or None."""
+    entry = OPERATIONS.get((representation, operation))
+    if entry is None:
+        entry = OPERATIONS.get((representation.lower(), operation.lower()))
+    return entry
+
+
+register_operation_name('add', 'addition')
+register_operation_name('subtract', 'subtraction', ('sub',))
+register_operation_name('multiply', 'multiplication', ('mul',), ('result', 'result_bits'))
+register_operation_name('divide', 'division', ('div',), ('quotient', 'remainder'))
+
+register_representation('unsigned', 'unsigned')
+register_representation('signed', 'signed', 'sign-magnitude', min_width=2,
+                        aliases=('signed_magnitude', 'sign_magnitude'))
+register_representation('ones_complement', "1's complement", min_width=1)
+register_representation('twos_complement', "2's complement", min_width=1)
+
+
+# --------------------------------------------------
+# 1c. Small-width lookup tables
+# --------------------------------------------------
+#  For widths up to TABLE_MAX_WIDTH every operand pair of an operation is
+#  computed once and kept in arrays indexed by a << w | b: the result and
+#  remainder bits plus one flag byte.  Error results do not depend on the
+#  operands' bits, so each distinct one is stored once per table and the
+#  flag byte's upper nibble points at it.
+
+TABLE_MAX_WIDTH = 8
+
+_T_CARRY, _T_OVERFLOW, _T_ZERO, _T_NEGATIVE = 1, 2, 4, 8
+_T_ERROR_SHIFT = 4
+_T_MAX_ERRORS = 15
+_T_FLAGS = [(bool(f & _T_CARRY), bool(f & _T_OVERFLOW), bool(f & _T_ZERO), bool(f & _T_NEGATIVE))
+            for f in range(16)]
+_new = object.__new__
+
+
+def _compact(values: list) -> array:
+    return array('B' if max(values, default=0) < 256 else 'H', values)
+
+
+class OperationTable:
+    """Every result of one registered operation at one width."""
+    __slots__ = ('width', 'values', 'remainders', 'flags', 'errors', 'value_width', 'remainder_width')
+
+    def __init__(self, entry, w: int):
+        self.width = w
+        self.value_width = self.remainder_width = None
+        self.errors = [None]  # index 0 means success
+        error_index = {}
+        values, remainders, flags = [], [], []
+        for a in range(1 << w):
+            x = BitVector(a, w)
+            for b in range(1 << w):
+                result = entry.method(x, BitVector(b, w))
+                if result.error:
+                    key = (result.error, result.carry, result.overflow, result.div_by_zero)
+                    if key not in error_index:
+                        if len(self.errors) > _T_MAX_ERRORS:
+                            raise ValueError(f'{entry.key} has too many distinct errors to tabulate')
+                        error_index[key] = len(self.errors)
+                        self.errors.append(result)
+                    values.append(0)
+                    remainders.append(0)
+                    flags.append(error_index[key] << _T_ERROR_SHIFT)
+                    continue
+                value, remainder = result.value, result.remainder
+                if self.value_width is None:
+                    self.value_width = value.width
+                    self.remainder_width = remainder.width if remainder is not None else None
+                if (value.width != self.value_width or result.div_by_zero
+                        or (remainder.width if remainder is not None else None) != self.remainder_width):
+                    raise ValueError(f'{entry.key} results are not uniform enough to tabulate')
+                values.append(value.value)
+                remainders.append(remainder.value if remainder is not None else 0)
+                flags.append(result.carry * _T_CARRY | result.overflow * _T_OVERFLOW
+                             | result.zero * _T_ZERO | result.negative * _T_NEGATIVE)
+        self.values = _compact(values)
+        self.remainders = _compact(remainders) if self.remainder_width is not None else None
+        self.flags = array('B', flags)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.values, self.remainders, self.flags)
+        return sum(len(arr) * arr.itemsize for arr in arrays if arr is not None)
+
+    def lookup(self, index: int) -> 'ALUResult':
+        # index is a << width | b, i.e. int(a + b, 2) for bit strings a and b
+        flags = self.flags[index]
+        if flags >> _T_ERROR_SHIFT:
+            return self.errors[flags >> _T_ERROR_SHIFT]
+        # stored bits are already masked, so skip the constructors
+        result = _new(ALUResult)
+        result.value = value = _new(BitVector)
+        value.value, value.width = self.values[index], self.value_width
+        if self.remainders is None:
+            result.remainder = None
+        else:
+            result.remainder = remainder = _new(BitVector)
+            remainder.value, remainder.width = self.remainders[index], self.remainder_width
+        result.carry, result.overflow, result.zero, result.negative = _T_FLAGS[flags]
+        result.div_by_zero = False
+        result.error = None
+        return result
+
+
+class SmallTables:
+    """OperationTables for registered operations, looked up but never built
+    on the hot path.
+
+    limit is the widest tabulated width, 0 while disabled (the default, so
+    scripts and pool workers never pay for tables they would barely use).
+    Tables are built by build() / build_all(), or by the thread started
+    with start_builder() once a pair has been looked up `threshold` times.
+    Building is idempotent, so two builders racing on a table only waste time.
+    """
+    __slots__ = ('limit', 'max_width', 'tables', 'uses', 'threshold', 'build_seconds',
+                 '_pending', '_builder')
+
+    def __init__(self, enabled: bool = False, max_width: int = TABLE_MAX_WIDTH):
+        self.tables = {}  # (Operation, width) -> OperationTable, or None if untabulatable
+        self.uses = {}  # (Operation, width) -> lookups while it had no table
+        self.threshold = 0
+        self.build_seconds = 0.0
+        self._pending = SimpleQueue()
+        self._builder = None
+        self.configure(enabled, max_width)
+
+    def configure(self, enabled: bool, max_width: int = TABLE_MAX_WIDTH):
+        self.max_width = min(max_width, TABLE_MAX_WIDTH)
+        self.limit = self.max_width if enabled else 0
+        if not enabled:
+            self.clear()
+
+    def clear(self):
+        self.tables = {}
+        self.uses = {}
+        self.build_seconds = 0.0
+
+    def get(self, entry, w: int):
+        """The built table for (entry, w), else None."""
+        key = (entry, w)
+        table = self.tables.get(key)
+        if table is None and key not in self.tables:
+            uses = self.uses[key] = self.uses.get(key, 0) + 1
+            # a forked pool worker inherits the builder but not its thread
+            if uses == self.threshold and self._builder is not None and self._builder.is_alive():
+                self._pending.put(key)
+        return table
+
+    def build(self, entry, w: int):
+        key = (entry, w)
+        if key in self.tables:
+            return self.tables[key]
+        start = perf_counter()
+        try:
+            if w < entry.representation.min_width:
+                raise ValueError(f'{entry.key} is undefined at width {w}')
+            table = OperationTable(entry, w)
+        except ValueError:
+            table = None  # this operation keeps using its method
+        self.build_seconds += perf_counter() - start
+        self.tables[key] = table
+        return table
+
+    def build_all(self):
+        """Eagerly build every table, narrowest (cheapest) first."""
+        entries = set(OPERATIONS.values())
+        for w in range(1, self.limit + 1):
+            for entry in entries:
+                self.build(entry, w)
+
+    def start_builder(self, threshold: int):
+        """Build, in a daemon thread, the table of each pair looked up
+        `threshold` times; no-op if the thread is already running."""
+        self.threshold = threshold
+        if self._builder is None or not self._builder.is_alive():
+            self._builder = Thread(target=self._build_pending, name='small-tables', daemon=True)
+            self._builder.start()
+
+    def _build_pending(self):
+        while True:
+            entry, w = self._pending.get()
+            if w <= self.limit:
+                self.build(entry, w)
+
+    def stats(self) -> dict:
+        built = [table for table in self.tables.values() if table is not None]
+        return {
+            "enabled": self.limit > 0,
+            "max_width": self.max_width,
+            "threshold": self.threshold,
+            "tables": len(built),
+            "bytes": sum(table.nbytes for table in built),
+            "build_seconds": round(self.build_seconds, 6),
+        }
+
+
+small_tables = SmallTables()
+
+
+def _valid_operands(a: str, b: str, w: int) -> bool:
+    return len(a) == w and len(b) == w and not a.strip('01') and not b.strip('01')
+
+def _result_size(obj) -> int:
+    if isinstance(obj, ALUResult):
+        bits = sum(v.width for v in (obj.value, obj.remainder) if v is not None)
+        return bits // 8 + 120
+    return approx_size(obj)
+
+# Results (and errors) of registered operations, keyed on
+# (Operation.key, operand a, operand b, width)
+operation_cache = LRUCache(sizeof=_result_size)
+
+def _unsupported(representation: str, operation: str) -> ALUResult:
+    return ALUResult(error=f"Unsupported operation '{operation}' for representation '{representation}'")
+
+def _compute(entry: Operation, a: str, b: str, w: int) -> ALUResult:
+    if w < entry.representation.min_width or not _valid_operands(a, b, w):
+        return BAD_INPUT
+    if 0 < w <= small_tables.limit:
+        table = small_tables.get(entry, w)
+        if table is not None:
+            return table.lookup(int(a + b, 2))
+    return entry.method(BitVector.from_str(a), BitVector.from_str(b))
+
+def _execute(entry: Operation, a: str, b: str, w: int) -> ALUResult:
+    key = (entry.key, a, b, w)
+    result = operation_cache.get(key)
+    if result is None:
+        result = _compute(entry, a, b, w)
+        operation_cache.put(key, result)
+    return result
+
+def operation_key(a: str, b: str, w: int, representation: str, operation: str) -> tuple:
+    entry = resolve_operation(representation, operation)
+    return (entry.key if entry else (representation, operation), a, b, w)
+
+def compute_operation(a: str, b: str, w: int, representation: str, operation: str) -> ALUResult:
+    """Uncached alu_operation, for callers that manage operation_cache themselves."""
+    entry = resolve_operation(representation, operation)
+    if entry is None:
+        return _unsupported(representation, operation)
+    return _compute(entry, a, b, w)
+
+def alu_operation(a: str, b: str, w: int, representation: str, operation: str) -> ALUResult:
+    """Non-raising entry point for every registered operation on bit strings."""
+    entry = resolve_operation(representation, operation)
+    if entry is None:
+        return _unsupported(representation, operation)
+    return _execute(entry, a, b, w)
 
 # --------------------------------------------------
-# 0.  Low-level binary helpers (string-only)
+# 1d. Packed operands
 # --------------------------------------------------
-def _binary_compare(a: str, b: str) -> int:
-    a, b = a.zfill(len(b)), b.zfill(len(a))
-    for ca, cb in zip(a, b):
-        if ca < cb: return -1
-        if ca > cb: return 1
-    return 0
+#  Operands can travel as big-endian bytes, ceil(w / 8) per operand,
+#  either raw or as hex/base64 text, instead of one '0'/'1' character per
+#  bit.  They are decoded once into BitVectors, which go straight to the
+#  Operation's method (or its small table) without a bit string in between.
+
+def _b64decode(text: str) -> bytes:
+    return base64.b64decode(text, validate=True)
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+# encoding name -> (text to bytes, bytes to text); both raise ValueError
+# (binascii.Error included) on malformed text
+PACKED_ENCODINGS = {
+    'hex': (bytes.fromhex, bytes.hex),
+    'base64': (_b64decode, _b64encode),
+}
 
-def _is_zero(b: str) -> bool:
-    return all(ch == '0' for ch in b)
+def packed_encoder(encoding: str = None):
+    """BitVector formatter for Operation.response: raw bytes or encoded text."""
+    if encoding is None:
+        return BitVector.to_bytes
+    to_text = PACKED_ENCODINGS[encoding][1]
+    return lambda vector: to_text(vector.to_bytes())
 
-def _left_shift(b: str, sh: int, w: int) -> str:
-    if sh >= w:
-        return '0' * w
-    return (b + '0' * sh)[-w:]
+def _compute_vectors(entry: Operation, x: BitVector, y: BitVector) -> ALUResult:
+    w = x.width
+    if w < entry.representation.min_width:
+        return BAD_INPUT
+    if 0 < w <= small_tables.limit:
+        table = small_tables.get(entry, w)
+        if table is not None:
+            return table.lookup(x.value << w | y.value)
+    return entry.method(x, y)
 
-def _add_no_overflow(a: str, b: str, w: int) -> str:
-    res = ['0'] * w
-    carry = 0
-    for i in range(w - 1, -1, -1):
-        s = int(a[i]) + int(b[i]) + carry
-        res[i] = str(s & 1)
-        carry = s >> 1
-    return ''.join(res)
+def packed_key(a: bytes, b: bytes, w: int, representation: str, operation: str) -> tuple:
+    # the raw operand bytes, so equal packed requests share one cache entry
+    entry = resolve_operation(representation, operation)
+    return (entry.key if entry else (representation, operation), 'packed', a, b, w)
+
+def compute_packed(a: bytes, b: bytes, w: int, representation: str, operation: str) -> ALUResult:
+    """compute_operation for operands already packed into bytes."""
+    entry = resolve_operation(representation, operation)
+    if entry is None:
+        return _unsupported(representation, operation)
+    try:
+        x, y = BitVector.from_bytes(a, w), BitVector.from_bytes(b, w)
+    except (TypeError, ValueError):
+        return BAD_INPUT
+    return _compute_vectors(entry, x, y)
+
+def _run(representation: str, operation: str, a: str, b: str, w: int):
+    return _execute(OPERATIONS[(representation, operation)], a, b, w).unwrap()
 
 # --------------------------------------------------
-# 1.  Unsigned
+# 2.  Unsigned
 # --------------------------------------------------
 def binary_addition(a: str, b: str, w: int) -> str:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    res = ['0'] * w
-    carry = 0
-    for i in range(w - 1, -1, -1):
-        s = int(a[i]) + int(b[i]) + carry
-        res[i] = str(s & 1)
-        carry = s >> 1
-    if carry:
-        raise ValueError('Overflow')
-    return ''.join(res)
+    return _run('unsigned', 'add', a, b, w)
 
 def binary_subtraction(a: str, b: str, w: int) -> str:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    if _binary_compare(b, a) > 0:
-        raise ValueError('Underflow')
-    res = ['0'] * w
-    borrow = 0
-    for i in range(w - 1, -1, -1):
-        diff = int(a[i]) - int(b[i]) - borrow
-        if diff < 0:
-            diff += 2
-            borrow = 1
-        else:
-            borrow = 0
-        res[i] = str(diff)
-    return ''.join(res)
+    return _run('unsigned', 'subtract', a, b, w)
 
 def binary_multiplication(a: str, b: str, w: int) -> str:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    prod = '0' * (2 * w)
-    ext = '0' * w + a
-    for i in range(w):
-        if b[w - 1 - i] == '1':
-            shifted = _left_shift(ext, i, 2 * w)
-            prod = _add_no_overflow(prod, shifted, 2 * w)
-    return prod
+    return _run('unsigned', 'multiply', a, b, w)
 
 def binary_division(a: str, b: str, w: int) -> tuple[str, str]:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    if _is_zero(b):
-        raise ValueError('Division by zero')
-    rem = '0' * w
-    quo = '0' * w
-    for i in range(w):
-        rem = rem[1:] + a[i]
-        if _binary_compare(rem, b) >= 0:
-            rem = binary_subtraction(rem, b, w)
-            quo = quo[:i] + '1' + quo[i + 1:]
-    return quo, rem
+    return _run('unsigned', 'divide', a, b, w)
 
 # --------------------------------------------------
-# 2.  Sign-magnitude
+# 3.  Sign-magnitude
 # --------------------------------------------------
 def signed_binary_addition(a: str, b: str, w: int) -> str:
-    if w < 2 or len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    sa, ma = a[0], a[1:]
-    sb, mb = b[0], b[1:]
-    if sa == sb:
-        try:
-            mag = binary_addition(ma, mb, w - 1)
-            return sa + mag
-        except ValueError:
-            raise ValueError('Signed magnitude overflow')
-    else:
-        cmp = _binary_compare(ma, mb)
-        if cmp > 0:
-            return sa + binary_subtraction(ma, mb, w - 1)
-        elif cmp < 0:
-            return sb + binary_subtraction(mb, ma, w - 1)
-        else:
-            return '0' * w
+    return _run('signed', 'add', a, b, w)
 
 def signed_binary_subtraction(a: str, b: str, w: int) -> str:
-    inv_sign = '0' if b[0] == '1' else '1'
-    b_neg = inv_sign + b[1:]
-    return signed_binary_addition(a, b_neg, w)
+    return _run('signed', 'subtract', a, b, w)
 
 def signed_binary_multiplication(a: str, b: str, w: int) -> str:
-    if w < 2 or len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    sa, ma = a[0], a[1:]
-    sb, mb = b[0], b[1:]
-    mag_prod = binary_multiplication(ma, mb, w - 1)[-(2 * w - 1):]
-    sign = '1' if sa != sb else '0'
-    return sign + mag_prod
+    return _run('signed', 'multiply', a, b, w)
 
 def signed_binary_division(a: str, b: str, w: int) -> tuple[str, str]:
-    if w < 2 or len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    sa, ma = a[0], a[1:]
-    sb, mb = b[0], b[1:]
-    if _is_zero(mb):
-        raise ValueError('Division by zero')
-    q, r = binary_division(ma, mb, w - 1)
-    q_sign = '1' if sa != sb else '0'
-    r_sign = sa
-    return q_sign + q, r_sign + r
+    return _run('signed', 'divide', a, b, w)
 
 # --------------------------------------------------
-# 3.  1's complement
+# 4.  1's complement
 # --------------------------------------------------
 def ones_complement_addition(a: str, b: str, w: int) -> str:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    s = ['0'] * w
-    carry = 0
-    for i in range(w - 1, -1, -1):
-        t = int(a[i]) + int(b[i]) + carry
-        s[i] = str(t & 1)
-        carry = t >> 1
-    if carry:
-        one = '0' * (w - 1) + '1'
-        s = list(_add_no_overflow(''.join(s), one, w))
-    # overflow check: same-sign operands, opposite-sign result
-    if a[0] == b[0] and s[0] != a[0]:
-        raise ValueError('1\'s complement overflow')
-    return ''.join(s)
+    return _run('ones_complement', 'add', a, b, w)
 
 def ones_complement_subtraction(a: str, b: str, w: int) -> str:
-    b_inv = ''.join('1' if c == '0' else '0' for c in b)
-    return ones_complement_addition(a, b_inv, w)
+    return _run('ones_complement', 'subtract', a, b, w)
 
 def ones_complement_multiplication(a: str, b: str, w: int) -> str:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    ma = a[1:] if a[0] == '0' else ''.join('1' if c == '0' else '0' for c in a[1:])
-    mb = b[1:] if b[0] == '0' else ''.join('1' if c == '0' else '0' for c in b[1:])
-    mag = binary_multiplication(ma, mb, w - 1)[-(2 * w - 1):]
-    sign = '1' if a[0] != b[0] else '0'
-    if sign == '1':
-        mag = ''.join('1' if c == '0' else '0' for c in mag)
-    return sign + mag
+    return _run('ones_complement', 'multiply', a, b, w)
 
 def ones_complement_division(a: str, b: str, w: int) -> tuple[str, str]:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    if _is_zero(b) or b == '1' * w:
-        raise ValueError('Division by zero')
-    ma = a[1:] if a[0] == '0' else ''.join('1' if c == '0' else '0' for c in a[1:])
-    mb = b[1:] if b[0] == '0' else ''.join('1' if c == '0' else '0' for c in b[1:])
-    q, r = binary_division(ma, mb, w - 1)
-    q_sign = '1' if a[0] != b[0] else '0'
-    r_sign = a[0]
-    if q_sign == '1':
-        q = ''.join('1' if c == '0' else '0' for c in q)
-    if r_sign == '1':
-        r = ''.join('1' if c == '0' else '0' for c in r)
-    return q_sign + q, r_sign + r
-
-# --------------------------------------------------
-# 4.  2's complement
-# --------------------------------------------------
-def _twos_neg(v: str, w: int) -> str:
-    inv = ''.join('1' if c == '0' else '0' for c in v)
-    one = '0' * (w - 1) + '1'
-    return _add_no_overflow(inv, one, w)
+    return _run('ones_complement', 'divide', a, b, w)
 
+# --------------------------------------------------
+# 5.  2's complement
+# --------------------------------------------------
 def twos_complement_addition(a: str, b: str, w: int) -> str:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    s = ['0'] * w
-    carry = 0
-    for i in range(w - 1, -1, -1):
-        t = int(a[i]) + int(b[i]) + carry
-        s[i] = str(t & 1)
-        carry = t >> 1
-    # overflow if same-sign operands, opposite-sign result
-    if a[0] == b[0] and s[0] != a[0]:
-        raise ValueError('2\'s complement overflow')
-    return ''.join(s)
+    return _run('twos_complement', 'add', a, b, w)
 
 def twos_complement_subtraction(a: str, b: str, w: int) -> str:
     if b == '1' + '0' * (w - 1):
         raise ValueError('2\'s complement subtraction error')
-    b_neg = _twos_neg(b, w)
-    return twos_complement_addition(a, b_neg, w)
+    return _run('twos_complement', 'subtract', a, b, w)
 
 def twos_complement_multiplication(a: str, b: str, w: int) -> str:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
-        raise ValueError('Bad input')
-    neg_a = a[0] == '1'
-    neg_b = b[0] == '1'
-    abs_a = a if not neg_a else _twos_neg(a, w)
-    abs_b = b if not neg_b else _twos_neg(b, w)
-    prod = binary_multiplication(abs_a, abs_b, w)
-    if neg_a ^ neg_b:
-        prod = _twos_neg(prod, 2 * w)
-    return prod
+    return _run('twos_complement', 'multiply', a, b, w)
 
 def twos_complement_division(a: str, b: str, w: int) -> tuple[str, str]:
-    if len(a) != w or len(b) != w or set(a + b) - {'0', '1'}:
+    return _run('twos_complement', 'divide', a, b, w)
+
+_BUILTIN_OPERATIONS = {
+    ('unsigned', 'add'): (BitVector.add, binary_addition),
+    ('unsigned', 'subtract'): (BitVector.sub, binary_subtraction),
+    ('unsigned', 'multiply'): (BitVector.mul, binary_multiplication),
+    ('unsigned', 'divide'): (BitVector.div, binary_division),
+    ('signed', 'add'): (BitVector.sm_add, signed_binary_addition),
+    ('signed', 'subtract'): (BitVector.sm_sub, signed_binary_subtraction),
+    ('signed', 'multiply'): (BitVector.sm_mul, signed_binary_multiplication),
+    ('signed', 'divide'): (BitVector.sm_div, signed_binary_division),
+    ('ones_complement', 'add'): (BitVector.oc_add, ones_complement_addition),
+    ('ones_complement', 'subtract'): (BitVector.oc_sub, ones_complement_subtraction),
+    ('ones_complement', 'multiply'): (BitVector.oc_mul, ones_complement_multiplication),
+    ('ones_complement', 'divide'): (BitVector.oc_div, ones_complement_division),
+    ('twos_complement', 'add'): (BitVector.tc_add, twos_complement_addition),
+    ('twos_complement', 'subtract'): (BitVector.tc_sub, twos_complement_subtraction),
+    ('twos_complement', 'multiply'): (BitVector.tc_mul, twos_complement_multiplication),
+    ('twos_complement', 'divide'): (BitVector.tc_div, twos_complement_division),
+}
+for (_rep, _op), (_method, _function) in _BUILTIN_OPERATIONS.items():
+    register_operation(_rep, _op, _method, _function)
+
+# --------------------------------------------------
+# 6.  NumPy batch kernel (widths 1..64)
+# --------------------------------------------------
+#  Operands are uint64 arrays of bit patterns.  Instead of raising, every
+#  row gets a status code; rows that fail hold 0 in result/remainder.
+#  Products are up to 2w bits wide, so they come back split into
+#  result_hi (bits 64 and up) and result (low 64 bits).
+#  NumPy is imported on first use (batch_operation or module_2.np): it is
+#  the slowest import here and the API server never needs it.
+
+def _load_numpy():
+    global np
+    if 'np' not in globals():
+        try:
+            import numpy as np
+        except ImportError:  # the batch kernel is optional
+            np = None
+    return np
+
+def __getattr__(name):
+    if name == 'np':
+        return _load_numpy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+STATUS_OK = 0
+STATUS_OVERFLOW = 1
+STATUS_UNDERFLOW = 2
+STATUS_DIV_BY_ZERO = 3
+STATUS_SUB_ERROR = 4  # 2's complement subtraction of the most negative value
+
+_BATCH_REPRESENTATIONS = ('unsigned', 'signed', 'ones_complement', 'twos_complement')
+
+
+class BatchResult:
+    """Arrays produced by batch_operation, one row per operand pair."""
+    __slots__ = ('result', 'result_hi', 'remainder', 'status', 'width')
+
+    def __init__(self, result, result_hi, remainder, status, width):
+        self.result = result
+        self.result_hi = result_hi
+        self.remainder = remainder
+        self.status = status
+        self.width = width  # width of result (2w or 2w-1 for products)
+
+    @property
+    def overflow(self):
+        return self.status == STATUS_OVERFLOW
+
+    @property
+    def error(self):
+        return self.status != STATUS_OK
+
+
+def _wide_mul(a, b):
+    # full 128-bit product of two uint64 arrays as (hi, lo)
+    low = np.uint64(0xFFFFFFFF)
+    a0, a1 = a & low, a >> np.uint64(32)
+    b0, b1 = b & low, b >> np.uint64(32)
+    p00, p01, p10, p11 = a0 * b0, a0 * b1, a1 * b0, a1 * b1
+    mid = (p00 >> np.uint64(32)) + (p01 & low) + (p10 & low)
+    lo = (p00 & low) | (mid << np.uint64(32))
+    hi = p11 + (p01 >> np.uint64(32)) + (p10 >> np.uint64(32)) + (mid >> np.uint64(32))
+    return hi, lo
+
+
+def _wide_mask(hi, lo, bits):
+    if bits >= 64:
+        return hi & np.uint64((1 << (bits - 64)) - 1), lo
+    return np.zeros_like(hi), lo & np.uint64((1 << bits) - 1)
+
+
+def _wide_neg(hi, lo, bits):
+    return _wide_mask(~hi + (lo == 0).astype(np.uint64), ~lo + np.uint64(1), bits)
+
+
+def _wide_set_bit(hi, lo, bit, cond):
+    flag = cond.astype(np.uint64)
+    if bit >= 64:
+        return hi | (flag << np.uint64(bit - 64)), lo
+    return hi, lo | (flag << np.uint64(bit))
+
+
+def batch_operation(a, b, w: int, representation: str, operation: str) -> BatchResult:
+    """Vectorised counterpart of the 16 string functions for w <= 64.
+
+    a and b are array-likes of unsigned bit patterns.  Matches the scalar
+    functions row by row, reporting errors through BatchResult.status.
+    """
+    if _load_numpy() is None:
+        raise ImportError('batch_operation requires numpy')
+    entry = resolve_operation(representation, operation)
+    if entry is None or entry.representation.name not in _BATCH_REPRESENTATIONS:
+        raise ValueError(f"Unsupported operation '{operation}' for representation '{representation}'")
+    rep, op = entry.representation.name, entry.name
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    if a.shape != b.shape or not 1 <= w <= 64 or w < entry.representation.min_width:
         raise ValueError('Bad input')
-    if _is_zero(b):
-        raise ValueError('Division by zero')
-    if a == '1' + '0' * (w - 1) and b == '1' * w:
-        raise ValueError('2\'s complement division overflow')
-    neg_a = a[0] == '1'
-    neg_b = b[0] == '1'
-    abs_a = a if not neg_a else _twos_neg(a, w)
-    abs_b = b if not neg_b else _twos_neg(b, w)
-    q, r = binary_division(abs_a, abs_b, w)
-    if neg_a ^ neg_b and not _is_zero(q):
-        q = _twos_neg(q, w)
-    if neg_a and not _is_zero(r):
-        r = _twos_neg(r, w)
-    return q, r
\ No newline at end of file
+    mask = np.uint64((1 << w) - 1)
+    if ((a & ~mask) | (b & ~mask)).any():
+        raise ValueError('Bad input')
+
+    top = np.uint64(w - 1)
+    one = np.uint64(1)
+    zero = np.zeros_like(a)
+    status = np.zeros(a.shape, dtype=np.uint8)
+    sa, sb = (a >> top) & one, (b >> top) & one
+    mag_mask = mask >> one
+    result_w = w
+    hi = zero
+
+    if rep == 'unsigned':
+        if op == 'add':
+            s = a + b
+            status[(s < a) | ((s & ~mask) != 0)] = STATUS_OVERFLOW
+            res, rem = s & mask, zero
+        elif op == 'subtract':
+            status[b > a] = STATUS_UNDERFLOW
+            res, rem = (a - b) & mask, zero
+        elif op == 'multiply':
+            result_w = 2 * w
+            hi, res = _wide_mul(a, b)
+            rem = zero
+        else:
+            status[b == 0] = STATUS_DIV_BY_ZERO
+            res, rem = np.divmod(a, np.where(b == 0, one, b))
+
+    elif rep == 'signed':
+        ma, mb = a & mag_mask, b & mag_mask
+        if op == 'subtract':
+            sb ^= one
+        if op in ('add', 'subtract'):
+            mag = ma + mb
+            same = sa == sb
+            status[same & ((mag >> top) != 0)] = STATUS_OVERFLOW
+            diff = np.where(ma > mb, (sa << top) | (ma - mb), (sb << top) | (mb - ma))
+            diff[ma == mb] = 0
+            res, rem = np.where(same, (sa << top) | (mag & mag_mask), diff), zero
+        elif op == 'multiply':
+            result_w = 2 * w - 1
+            hi, res = _wide_set_bit(*_wide_mul(ma, mb), 2 * w - 2, sa != sb)
+            rem = zero
+        else:
+            status[mb == 0] = STATUS_DIV_BY_ZERO
+            q, r = np.divmod(ma, np.where(mb == 0, one, mb))
+            res, rem = ((sa ^ sb) << top) | q, (sa << top) | r
+
+    elif rep == 'ones_complement':
+        if op == 'subtract':
+            b = ~b & mask
+            sb = (b >> top) & one
+        if op in ('add', 'subtract'):
+            s = a + b
+            carry = (s < a) | ((s & ~mask) != 0)
+            res = (s + carry.astype(np.uint64)) & mask
+            status[(sa == sb) & (((res >> top) & one) != sa)] = STATUS_OVERFLOW
+            rem = zero
+        else:
+            oa = np.where(sa == 1, ~a & mag_mask, a & mag_mask)
+            ob = np.where(sb == 1, ~b & mag_mask, b & mag_mask)
+            if op == 'multiply':
+                result_w = 2 * w - 1
+                hi, res = _wide_mul(oa, ob)
+                ihi, ires = _wide_mask(~hi, ~res, result_w)
+                neg = sa != sb
+                hi, res = np.where(neg, ihi, hi), np.where(neg, ires, res)
+                rem = zero
+            else:
+                status[(b == 0) | (b == mask)] = STATUS_DIV_BY_ZERO
+                q, r = np.divmod(oa, np.where(ob == 0, one, ob))
+                res = np.where(sa != sb, ~q & mask, q)
+                rem = np.where(sa == 1, ~r & mask, r)
+
+    else:
+        minimum = one << top
+        if op == 'subtract':
+            status[b == minimum] = STATUS_SUB_ERROR
+            b = (~b + one) & mask
+            sb = (b >> top) & one
+        if op in ('add', 'subtract'):
+            res = (a + b) & mask
+            overflow = (sa == sb) & (((res >> top) & one) != sa) & (status == STATUS_OK)
+            status[overflow] = STATUS_OVERFLOW
+            rem = zero
+        else:
+            abs_a = np.where(sa == 1, (~a + one) & mask, a)
+            abs_b = np.where(sb == 1, (~b + one) & mask, b)
+            neg = sa != sb
+            if op == 'multiply':
+                result_w = 2 * w
+                hi, res = _wide_mul(abs_a, abs_b)
+                nhi, nres = _wide_neg(hi, res, result_w)
+                hi, res = np.where(neg, nhi, hi), np.where(neg, nres, res)
+                rem = zero
+            else:
+                status[(a == minimum) & (b == mask)] = STATUS_OVERFLOW
+                status[b == 0] = STATUS_DIV_BY_ZERO
+                q, r = np.divmod(abs_a, np.where(abs_b == 0, one, abs_b))
+                res = np.where(neg, (~q + one) & mask, q)
+                rem = np.where(sa == 1, (~r + one) & mask, r)
+
+    failed = status != STATUS_OK
+    return BatchResult(np.where(failed, 0, res).astype(np.uint64),
+                       np.where(failed, 0, hi).astype(np.uint64),
+                       np.where(failed, 0, rem).astype(np.uint64),
+                       status, result_w)
@@ -0,0 +1,170 @@
+# ================= profiling.py =================
+#  On-demand profiling of individual requests.  ProfilerMiddleware runs a
+#  sample of requests, plus any carrying the opt-in header, under cProfile
+#  and keeps each one's per-function stats in a RollingProfile of the most
+#  recent ones.  Merged, they render as pstats text or dump in the binary
+#  pstats format (pstats.Stats, snakeviz, flameprof, ...).
+#
+#  The profiler is switched on only while the profiled request's own
+#  coroutine runs, not while the event loop serves other requests in
+#  between, so concurrent traffic does not leak into the profile.  Work
+#  the request hands to a process pool is out of the profiler's sight, so
+#  while a request is profiled `profiling` holds a list in its context;
+#  main.py runs pool jobs through profile_call and appends the stats the
+#  worker sends back.  Tasks the request spawns are not profiled.
+
+import cProfile
+import io
+import marshal
+import pstats
+import secrets
+import time
+from collections import deque
+from contextvars import ContextVar
+from random import random
+
+# The current request's list of stats from other processes, None while
+# it is not profiled
+profiling = ContextVar('profiling', default=None)
+
+
+def profile_call(func, *args):
+    """func(*args) and its cProfile stats, for work in another process
+    (a pool worker) that the request's own profiler cannot see."""
+    profiler = cProfile.Profile()
+    value = profiler.runcall(func, *args)
+    profiler.create_stats()
+    return value, profiler.stats
+
+
+class _Snapshot:
+    # pstats.Stats accepts anything with create_stats() and a stats dict,
+    # and takes that dict over, so each snapshot wraps a copy
+    __slots__ = ('stats',)
+
+    def __init__(self, stats: dict):
+        self.stats = dict(stats)
+
+    def create_stats(self):
+        pass
+
+
+class RollingProfile:
+    """Stats of the last `window` profiled requests, merged on demand."""
+    __slots__ = ('entries', 'profiled')
+
+    def __init__(self, window: int = 200):
+        self.entries = deque(maxlen=window)  # (unix time, path, seconds, [stats])
+        self.profiled = 0
+
+    def add(self, path: str, seconds: float, profiler: cProfile.Profile, extra=()):
+        # extra: stats of the request's work in other processes
+        profiler.create_stats()
+        self.entries.append((time.time(), path, seconds, [profiler.stats, *extra]))
+        self.profiled += 1
+
+    def clear(self) -> int:
+        cleared = len(self.entries)
+        self.entries.clear()
+        return cleared
+
+    def merged(self, stream=None):
+        """pstats.Stats over every kept request, None while empty."""
+        combined = None
+        for _, _, _, parts in list(self.entries):
+            for stats in parts:
+                if not stats:
+                    continue
+                if combined is None:
+                    combined = pstats.Stats(_Snapshot(stats), stream=stream)
+                else:
+                    combined.add(_Snapshot(stats))
+        return combined
+
+    def dump(self) -> bytes:
+        # what pstats.Stats.dump_stats writes, loadable with pstats.Stats(path)
+        combined = self.merged()
+        return marshal.dumps(combined.stats if combined else {})
+
+    def text(self, sort: str = 'cumulative', limit: int = 40, match: str = '') -> str:
+        """print_stats output, only functions matching the regex `match` if
+        given; raises KeyError for an unknown sort key."""
+        stream = io.StringIO()
+        combined = self.merged(stream)
+        if combined is None:
+            return 'No requests profiled yet\n'
+        combined.sort_stats(sort).print_stats(*((match, limit) if match else (limit,)))
+        return stream.getvalue()
+
+    def summary(self, limit: int = 20) -> dict:
+        recent = [{'time': at, 'path': path, 'seconds': seconds}
+                  for at, path, seconds, _ in list(self.entries)[-limit:]]
+        return {'kept': len(self.entries), 'window': self.entries.maxlen,
+                'profiled': self.profiled, 'recent': recent}
+
+
+class _Profiled:
+    """Awaitable running a coroutine with the profiler enabled only while
+    the coroutine itself executes, i.e. between two of its suspensions."""
+    __slots__ = ('coro', 'profiler')
+
+    def __init__(self, coro, profiler: cProfile.Profile):
+        self.coro = coro
+        self.profiler = profiler
+
+    def __await__(self):
+        coro, profiler = self.coro, self.profiler
+        value, error = None, None
+        while True:
+            profiler.enable()
+            try:
+                yielded = coro.send(value) if error is None else coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                profiler.disable()
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:  # cancellation and friends go to the coroutine
+                value, error = None, e
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling a fraction `rate` of HTTP requests and
+    any request whose `header` is set to `token`; without a token the
+    header is ignored, so clients cannot opt in on their own.
+
+    Paths starting with one of `exclude` are never profiled.
+    """
+    __slots__ = ('app', 'profile', 'rate', 'header', 'token', 'exclude')
+
+    def __init__(self, app, profile: RollingProfile, rate: float = 0.0, header: str = 'x-profile',
+                 token: str = '', exclude: tuple = ()):
+        self.app = app
+        self.profile = profile
+        self.rate = rate
+        self.header = header.lower().encode('latin-1') if header and token else None
+        self.token = token.encode('latin-1')
+        self.exclude = tuple(exclude)
+
+    def _wanted(self, scope) -> bool:
+        if scope['path'].startswith(self.exclude):
+            return False
+        if self.header is not None:
+            for name, value in scope['headers']:
+                if name == self.header:
+                    return secrets.compare_digest(value, self.token)
+        return self.rate > 0 and random() < self.rate
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._wanted(scope):
+            return await self.app(scope, receive, send)
+        profiler = cProfile.Profile()
+        elsewhere = []
+        active = profiling.set(elsewhere)
+        start = time.perf_counter()
+        try:
+            await _Profiled(self.app(scope, receive, send), profiler)
+        finally:
+            self.profile.add(scope['path'], time.perf_counter() - start, profiler, elsewhere)
+            profiling.reset(active)
@@ -0,0 +1,253 @@
+# ================= shared_cache.py =================
+#  Result cache shared by every process on a host through a memory-mapped
+#  file (put it on /dev/shm to keep it in RAM).  The file is a fixed array
+#  of fixed-size slots: a key hashes to a window of PROBE_SLOTS
+#  neighbouring slots (open addressing).  A value that does not fit in one
+#  slot is zlib-compressed, and if it still does not fit it is simply not
+#  shared.  Nor are results of small inputs (keys shorter than
+#  min_key_bytes pickled), which recompute faster than a shared lookup.
+#
+#  Eviction is CLOCK (second chance) within the window: a hit sets the
+#  slot's reference bit, and an insert into a full window walks it from a
+#  shared hand, clearing set bits, until it finds a clear one.
+#
+#  Concurrency: writers serialise on flock() of the file (and a thread
+#  lock in-process).  Readers take no lock: every slot carries a sequence
+#  number that is odd while it is being written, plus a crc32 of its
+#  payload, and a read that saw the number change or the crc mismatch is
+#  treated as a miss.
+#
+#  The file must be a regular file owned by this user and private to it
+#  (it is opened without following symlinks).  Values are stored in the
+#  caller's plain-data encoding (JSON by default), never pickled, so
+#  reading the file cannot run code.
+
+import fcntl
+import json
+import mmap
+import os
+import pickle
+import stat
+import struct
+import sys
+import zlib
+from hashlib import blake2b, sha256
+from threading import Lock
+
+MAGIC = b'DLDSHMC1'
+# magic, slots, slot size, generation tag, clock hand
+_HEADER = struct.Struct('<8sII16sI')
+HEADER_BYTES = 64
+# sequence, crc32 of the value, key digest, value length, reference bit,
+# compressed flag
+_SLOT = struct.Struct('<II16sIBB')
+SLOT_HEADER_BYTES = 32
+_REF_OFFSET = 28
+_HAND_OFFSET = _HEADER.size - 4
+
+PROBE_SLOTS = 8
+_EMPTY = bytes(16)
+
+
+def source_tag(*module_names) -> bytes:
+    """Digest of the named modules' source files, a SharedCache tag that
+    changes whenever the code producing the cached values does."""
+    digest = blake2b(digest_size=16)
+    for name in module_names:
+        with open(sys.modules[name].__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def key_digest(pickled_key: bytes) -> bytes:
+    """128-bit digest of a pickled key built from str/int/bytes/bool/None
+    tuples, whose pickles are deterministic; keys are only ever dumped.
+    SHA-256 rather than BLAKE2: keys run to kilobytes and it is
+    hardware-accelerated on current CPUs."""
+    digest = sha256(pickled_key).digest()[:16]
+    return digest if digest != _EMPTY else b'\x01' + digest[1:]
+
+
+def _json_encode(value) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+class SharedCache:
+    """Fixed-slot hash table in a memory-mapped file.
+
+    The first process creates the file; later ones map it and must agree
+    on slots and slot_bytes.  A different `tag` (e.g. a hash of the code
+    producing the values) empties the table instead of serving stale
+    results.  Values go through `encode` (value -> bytes) and `decode`;
+    the default JSON keeps str/int/bool/None, and lists for tuples.
+    get/put have LRUCache's signatures, so it can back one.
+    """
+    __slots__ = ('path', 'slots', 'slot_bytes', 'min_key_bytes', 'encode', 'decode', 'hits',
+                 'misses', 'stores', 'evictions', 'too_large', '_fd', '_map', '_lock')
+
+    def __init__(self, path: str, slots: int = 16384, slot_bytes: int = 4096, tag: bytes = b'',
+                 min_key_bytes: int = 0, encode=None, decode=None):
+        if slots < PROBE_SLOTS or slot_bytes <= SLOT_HEADER_BYTES:
+            raise ValueError(f'Need at least {PROBE_SLOTS} slots of more than {SLOT_HEADER_BYTES} bytes')
+        self.path = path
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.min_key_bytes = min_key_bytes
+        self.encode = encode or _json_encode
+        self.decode = decode or json.loads
+        self.hits = self.misses = self.stores = self.evictions = self.too_large = 0
+        self._lock = Lock()
+        tag = blake2b(tag, digest_size=16).digest()
+        size = HEADER_BYTES + slots * slot_bytes
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC, 0o600)
+        try:
+            st = os.fstat(self._fd)
+            if not stat.S_ISREG(st.st_mode) or st.st_uid != os.geteuid() or st.st_mode & 0o077:
+                raise PermissionError(f'{path} must be a regular file private to this user (mode 0600)')
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size == 0:
+                    os.ftruncate(self._fd, size)
+                    self._map = mmap.mmap(self._fd, size)
+                    _HEADER.pack_into(self._map, 0, MAGIC, slots, slot_bytes, tag, 0)
+                else:
+                    self._attach(size, tag)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def _attach(self, size: int, tag: bytes):
+        # map an existing file, checking its layout (called under the file lock)
+        if os.fstat(self._fd).st_size != size:
+            raise ValueError(f'{self.path} has a different size; remove it or match its layout')
+        self._map = mmap.mmap(self._fd, size)
+        magic, slots, slot_bytes, old_tag, _ = _HEADER.unpack_from(self._map, 0)
+        if (magic, slots, slot_bytes) != (MAGIC, self.slots, self.slot_bytes):
+            self._map.close()
+            raise ValueError(f'{self.path} has a different layout; remove it or match its layout')
+        if old_tag != tag:
+            self._map[HEADER_BYTES:] = bytes(size - HEADER_BYTES)
+            _HEADER.pack_into(self._map, 0, MAGIC, slots, slot_bytes, tag, 0)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    def _window(self, digest: bytes):
+        start = int.from_bytes(digest[:8], 'little') % self.slots
+        slot_bytes = self.slot_bytes
+        return [HEADER_BYTES + ((start + i) % self.slots) * slot_bytes for i in range(PROBE_SLOTS)]
+
+    def _digest(self, key):
+        # None for keys too small to be worth sharing
+        pickled = pickle.dumps(key, protocol=5)
+        return key_digest(pickled) if len(pickled) >= self.min_key_bytes else None
+
+    def get(self, key, default=None):
+        digest = self._digest(key)
+        if digest is None:
+            return default
+        view = self._map
+        for offset in self._window(digest):
+            seq, crc, slot_digest, length, ref, compressed = _SLOT.unpack_from(view, offset)
+            if slot_digest != digest or seq & 1 or length > self.slot_bytes - SLOT_HEADER_BYTES:
+                continue
+            start = offset + SLOT_HEADER_BYTES
+            payload = view[start:start + length]
+            # torn read: a writer got in between, treat as a miss
+            if _SLOT.unpack_from(view, offset)[0] != seq or zlib.crc32(payload) != crc:
+                continue
+            if not ref:
+                view[offset + _REF_OFFSET] = 1
+            self.hits += 1
+            return self.decode(zlib.decompress(payload) if compressed else payload)
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        digest = self._digest(key)
+        if digest is None:
+            return
+        payload = self.encode(value)
+        compressed = len(payload) > self.slot_bytes - SLOT_HEADER_BYTES
+        if compressed:
+            # long digit strings shrink several times over
+            payload = zlib.compress(payload, 1)
+            if len(payload) > self.slot_bytes - SLOT_HEADER_BYTES:
+                self.too_large += 1
+                return
+        window = self._window(digest)
+        view = self._map
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                target = empty = None
+                for offset in window:
+                    slot_digest = _SLOT.unpack_from(view, offset)[2]
+                    if slot_digest == digest:
+                        target = offset
+                        break
+                    if empty is None and slot_digest == _EMPTY:
+                        empty = offset
+                if target is None:
+                    target = empty if empty is not None else self._victim(window)
+                seq, _, old_digest = _SLOT.unpack_from(view, target)[:3]
+                if old_digest not in (_EMPTY, digest):
+                    self.evictions += 1
+                # odd sequence while the slot is inconsistent, even again after
+                struct.pack_into('<I', view, target, (seq + 1) & 0xFFFFFFFF)
+                start = target + SLOT_HEADER_BYTES
+                view[start:start + len(payload)] = payload
+                struct.pack_into('<I16sIBB', view, target + 4, zlib.crc32(payload), digest, len(payload), 0,
+                                 compressed)
+                struct.pack_into('<I', view, target, (seq + 2) & 0xFFFFFFFF)
+                self.stores += 1
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _victim(self, window: list) -> int:
+        # second chance from the shared hand: clear set reference bits
+        # until a clear one comes up (at most one full turn plus one)
+        view = self._map
+        hand = struct.unpack_from('<I', view, _HAND_OFFSET)[0]
+        for step in range(2 * PROBE_SLOTS):
+            offset = window[(hand + step) % PROBE_SLOTS]
+            if view[offset + _REF_OFFSET]:
+                view[offset + _REF_OFFSET] = 0
+            else:
+                break
+        struct.pack_into('<I', view, _HAND_OFFSET, (hand + step + 1) & 0xFFFFFFFF)
+        return offset
+
+    def clear(self):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                for index in range(self.slots):
+                    offset = HEADER_BYTES + index * self.slot_bytes
+                    seq = struct.unpack_from('<I', self._map, offset)[0]
+                    # bump the sequence so in-flight readers drop what they read
+                    _SLOT.pack_into(self._map, offset, (seq + 2) & 0xFFFFFFFF, 0, _EMPTY, 0, 0, 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def used(self) -> int:
+        view, slot_bytes = self._map, self.slot_bytes
+        return sum(view[offset + 8:offset + 24] != _EMPTY
+                   for offset in range(HEADER_BYTES, HEADER_BYTES + self.slots * slot_bytes, slot_bytes))
+
+    def stats(self) -> dict:
+        # hit/miss counters are this process's; used slots are the whole table's
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "too_large": self.too_large,
+            "used_slots": self.used(),
+            "slots": self.slots,
+            "slot_bytes": self.slot_bytes,
+            "min_key_bytes": self.min_key_bytes,
+        }
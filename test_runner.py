@@ -1,12 +1,90 @@
+import argparse
 import csv
+import itertools
 import math
 import sys
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from fastapi.exceptions import HTTPException
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import module_1 as converter
 import module_2 as arithmeticOps
+CONVERSION_HEADER = ['number', 'base_1', 'base_2', 'output1', 'output2', 'match', 'error']
+ARITHMETIC_HEADER = ['num1', 'num2', 'representation', 'operation', 'bit_width', 'result', 'overflow', 'error']
+
+def resolve_function(rep, op):
+    """The string function registered for (rep, op) in arithmeticOps, or None."""
+    entry = arithmeticOps.resolve_operation(rep, op)
+    return entry.function if entry else None
+
+
+def conversion_row(original_number_str, base_1, base_2):
+    """Roundtrip one number through base_2 and back; returns an output row."""
+    output1, output2, match, error = '', '', '', ''
+
+    try:
+        # Task 1: Convert from base_1 to base_2
+        output1 = converter.baseConverter(
+            type('', (), {'number': original_number_str,
+                          'from_base': base_1,
+                          'to_base': base_2})()
+        )
+
+        # Task 2: Convert back from base_2 to base_1
+        output2 = converter.baseConverter(
+            type('', (), {'number': output1,
+                          'from_base': base_2,
+                          'to_base': base_1})()
+        )
+
+        # Task 3: Check for a match
+        if '.' in original_number_str:
+            original_float = float(original_number_str)
+            output2_float = float(output2)
+            match = math.isclose(original_float, output2_float, rel_tol=1e-6)
+        else:
+            match = (original_number_str == output2)
+
+    except ValueError as e:
+        error = str(e)
+        match = False
+
+    except HTTPException as e:
+        error = str(e.detail)
+        match = False
+
+    return [original_number_str, base_1, base_2, output1, output2, match, error]
+
+
+def arithmetic_row(func_to_call, num1, num2, rep, op, bits):
+    """Run one operation with an already resolved function; returns an output row."""
+    result, overflow, error = '', False, ''
+
+    try:
+        if not func_to_call:
+            raise ValueError(f"Unsupported operation '{op}' for representation '{rep}'")
+
+        # Call the function and get the result
+        calc_result = func_to_call(num1, num2, bits)
+
+        # Division returns a tuple (quotient, remainder), format it
+        if isinstance(calc_result, tuple):
+            result = f"Quotient: {calc_result[0]}, Remainder: {calc_result[1]}"
+        else:
+            result = calc_result
+
+    except ValueError as e:
+        error = str(e)
+        # Check if the error message indicates an overflow
+        if 'overflow' in error.lower():
+            overflow = True
+
+    return [num1, num2, rep, op, bits, result, overflow, error]
+
+
 def test_base_conversion_roundtrip():
     """
     Reads base_conversion_input.csv, performs a roundtrip conversion,
@@ -15,10 +93,7 @@ def test_base_conversion_roundtrip():
     input_filename = 'base_conversion_input.csv'
     output_filename = 'base_conversion_output.csv'
     
-    # Header for the output file
-    output_header = ['number', 'base_1', 'base_2', 'output1', 'output2', 'match', 'error']
-    
-    output_rows = [output_header]
+    output_rows = [CONVERSION_HEADER]
 
     print(f"--- Starting Part A: Base Conversion Roundtrip Test ---")
     print(f"Reading from {input_filename}...")
@@ -27,44 +102,7 @@ def test_base_conversion_roundtrip():
         with open(input_filename, mode='r', newline='') as infile:
             reader = csv.DictReader(infile)
             for row in reader:
-                original_number_str = row['number']
-                base_1 = int(row['base_1'])
-                base_2 = int(row['base_2'])
-                
-                output1, output2, match, error = '', '', '', ''
-
-                try:
-                    # Task 1: Convert from base_1 to base_2
-                    output1 = converter.baseConverter(
-                        type('', (), {'number': original_number_str,
-                                      'from_base': base_1,
-                                      'to_base': base_2})()
-                    )
-
-                    # Task 2: Convert back from base_2 to base_1
-                    output2 = converter.baseConverter(
-                        type('', (), {'number': output1,
-                                      'from_base': base_2,
-                                      'to_base': base_1})()
-                    )
-
-                    # Task 3: Check for a match
-                    if '.' in original_number_str:
-                        original_float = float(original_number_str)
-                        output2_float = float(output2)
-                        match = math.isclose(original_float, output2_float, rel_tol=1e-6)
-                    else:
-                        match = (original_number_str == output2)
-
-                except ValueError as e:
-                    error = str(e)
-                    match = False
-
-                except HTTPException as e:
-                    error = str(e.detail)
-                    match = False
-                
-                output_rows.append([original_number_str, base_1, base_2, output1, output2, match, error])
+                output_rows.append(conversion_row(row['number'], int(row['base_1']), int(row['base_2'])))
 
         # Write all results to the output file
         with open(output_filename, mode='w', newline='') as outfile:
@@ -87,62 +125,17 @@ def test_binary_arithmetic():
     input_filename = 'binary_arithmetic_input.csv'
     output_filename = 'binary_arithmetic_output.csv'
     
-    output_header = ['num1', 'num2', 'representation', 'operation', 'bit_width', 'result', 'overflow', 'error']
-    output_rows = [output_header]
+    output_rows = [ARITHMETIC_HEADER]
 
     print(f"--- Starting Part B: Binary Arithmetic Processor ---")
     print(f"Reading from {input_filename}...")
 
-    # A map to easily call the correct function
-    # Maps (representation, operation) to a function from arithmeticOps
-    ops_map = {
-        ('unsigned', 'add'): arithmeticOps.binary_addition,
-        ('unsigned', 'sub'): arithmeticOps.binary_subtraction,
-        ('unsigned', 'mul'): arithmeticOps.binary_multiplication,
-        ('unsigned', 'div'): arithmeticOps.binary_division,
-        ('signed_magnitude', 'add'): arithmeticOps.signed_binary_addition,
-        ('signed_magnitude', 'sub'): arithmeticOps.signed_binary_subtraction,
-        ('signed_magnitude', 'mul'): arithmeticOps.signed_binary_multiplication,
-        ('signed_magnitude', 'div'): arithmeticOps.signed_binary_division,
-        ('ones_complement', 'add'): arithmeticOps.ones_complement_addition,
-        ('ones_complement', 'sub'): arithmeticOps.ones_complement_subtraction,
-        ('ones_complement', 'mul'): arithmeticOps.ones_complement_multiplication,
-        ('ones_complement', 'div'): arithmeticOps.ones_complement_division,
-        ('twos_complement', 'add'): arithmeticOps.twos_complement_addition,
-        ('twos_complement', 'sub'): arithmeticOps.twos_complement_subtraction,
-        ('twos_complement', 'mul'): arithmeticOps.twos_complement_multiplication,
-        ('twos_complement', 'div'): arithmeticOps.twos_complement_division,
-    }
-
     try:
         with open(input_filename, mode='r', newline='') as infile:
             reader = csv.DictReader(infile)
             for row in reader:
                 num1, num2, rep, op, bits = row['num1'], row['num2'], row['representation'], row['operation'], int(row['bit_width'])
-                result, overflow, error = '', False, ''
-
-                try:
-                    # Find the correct function to call
-                    func_to_call = ops_map.get((rep, op))
-                    if not func_to_call:
-                        raise ValueError(f"Unsupported operation '{op}' for representation '{rep}'")
-                    
-                    # Call the function and get the result
-                    calc_result = func_to_call(num1, num2, bits)
-
-                    # Division returns a tuple (quotient, remainder), format it
-                    if isinstance(calc_result, tuple):
-                        result = f"Quotient: {calc_result[0]}, Remainder: {calc_result[1]}"
-                    else:
-                        result = calc_result
-
-                except ValueError as e:
-                    error = str(e)
-                    # Check if the error message indicates an overflow
-                    if 'overflow' in error.lower():
-                        overflow = True
-                
-                output_rows.append([num1, num2, rep, op, bits, result, overflow, error])
+                output_rows.append(arithmetic_row(resolve_function(rep, op), num1, num2, rep, op, bits))
 
         with open(output_filename, mode='w', newline='') as outfile:
             writer = csv.writer(outfile)
@@ -156,7 +149,116 @@ def test_binary_arithmetic():
     print("-" * 50)
 
 
+def test_conversion_cache_keys():
+    """Equivalent numbers share a cache key; an invalid one never takes a valid one's."""
+    key = converter.conversion_key
+    assert key('007', 10, 2) == key('7', 10, 2)
+    assert key('0ff', 16, 2) == key('FF', 16, 2)
+    assert key('0-1', 10, 2) != key('-1', 10, 2)
+    assert key('0-.5', 10, 2) != key('-.5', 10, 2)
+    print("Conversion cache keys: ok")
+    print("-" * 50)
+
+
+# Parallel streaming mode for large CSV files: the input is read in chunks,
+# chunks are processed in a process pool, and results are written back in
+# input order as soon as the next chunk is done.  At most a few chunks per
+# worker are in flight, so memory stays flat however big the file is.
+
+def conversion_chunk(rows):
+    return [conversion_row(number, int(base_1), int(base_2)) for number, base_1, base_2 in rows]
+
+
+def arithmetic_chunk(rows):
+    # resolve each (representation, operation) in the registry once per chunk
+    groups = {}
+    for index, row in enumerate(rows):
+        groups.setdefault((row[2], row[3]), []).append(index)
+    output = [None] * len(rows)
+    for (rep, op), indices in groups.items():
+        func_to_call = resolve_function(rep, op)
+        for index in indices:
+            num1, num2, _, _, bits = rows[index]
+            output[index] = arithmetic_row(func_to_call, num1, num2, rep, op, int(bits))
+    return output
+
+
+PARALLEL_MODES = {
+    # mode: (input columns, output header, chunk worker)
+    'conversion': (('number', 'base_1', 'base_2'), CONVERSION_HEADER, conversion_chunk),
+    'arithmetic': (('num1', 'num2', 'representation', 'operation', 'bit_width'), ARITHMETIC_HEADER, arithmetic_chunk),
+}
+
+
+def _read_chunks(infile, columns, chunk_size):
+    reader = csv.DictReader(infile)
+    rows = ([row[name] for name in columns] for row in reader)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_parallel(mode, input_filename, output_filename, chunk_size=2000, workers=None):
+    """Stream input_filename through the pool and write output_filename in order."""
+    columns, header, chunk_worker = PARALLEL_MODES[mode]
+    workers = workers or os.cpu_count() or 1
+    window = workers * 2  # chunks in flight
+
+    print(f"--- Parallel {mode}: {input_filename} -> {output_filename} "
+          f"({workers} workers, {chunk_size} rows per chunk) ---")
+    start = time.perf_counter()
+    total = 0
+    try:
+        with open(input_filename, mode='r', newline='') as infile, \
+                open(output_filename, mode='w', newline='') as outfile, \
+                ProcessPoolExecutor(max_workers=workers) as pool:
+            writer = csv.writer(outfile)
+            writer.writerow(header)
+            pending = deque()
+            for chunk in _read_chunks(infile, columns, chunk_size):
+                pending.append(pool.submit(chunk_worker, chunk))
+                if len(pending) >= window:
+                    rows = pending.popleft().result()
+                    writer.writerows(rows)
+                    total += len(rows)
+            while pending:
+                rows = pending.popleft().result()
+                writer.writerows(rows)
+                total += len(rows)
+    except FileNotFoundError:
+        print(f"ERROR: Input file not found: {input_filename}")
+        return 0
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed else 0.0
+    print(f"Wrote {total} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    print("-" * 50)
+    return total
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run the CSV test workloads.")
+    parser.add_argument('--parallel', choices=sorted(PARALLEL_MODES),
+                        help="stream one workload through a process pool")
+    parser.add_argument('--input', help="input CSV (default: the workload's usual file)")
+    parser.add_argument('--output', help="output CSV (default: the workload's usual file)")
+    parser.add_argument('--chunk-size', type=int, default=2000, help="rows per chunk")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    return parser.parse_args(argv)
+
+
 if __name__ == '__main__':
-    # Run both parts of the assignment
-    test_base_conversion_roundtrip()
-    test_binary_arithmetic()
+    args = _parse_args(sys.argv[1:])
+    if args.parallel:
+        default_name = 'base_conversion' if args.parallel == 'conversion' else 'binary_arithmetic'
+        run_parallel(args.parallel,
+                     args.input or f'{default_name}_input.csv',
+                     args.output or f'{default_name}_output.csv',
+                     chunk_size=args.chunk_size, workers=args.workers)
+    else:
+        # Run both parts of the assignment
+        test_base_conversion_roundtrip()
+        test_binary_arithmetic()
+        test_conversion_cache_keys()
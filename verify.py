@@ -0,0 +1,463 @@
+# ================= verify.py =================
+#  Exhaustive correctness check of module_2 against an independent
+#  integer oracle.  Every operand pair is enumerated for widths up to
+#  --max-width, wider operands are sampled (edge values plus random
+#  pairs), and the work is spread over a process pool.
+#
+#    python verify.py [--max-width 12] [--engine alu|packed|string|batch] [--workers N]
+#
+#  The oracle decodes each bit pattern to the integer it represents, does
+#  plain integer arithmetic and encodes the answer back, so it shares no
+#  code with BitVector.  It is written with operators that work on Python
+#  ints and NumPy arrays alike: with NumPy installed a whole block of pairs
+#  is evaluated in one vectorised pass, without it pair by pair.
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import module_2
+
+np = module_2.np
+
+# Error codes of the oracle, indexes into ERRORS
+E_NONE, E_OVERFLOW, E_UNDERFLOW, E_DIV_ZERO, E_SM_OVERFLOW, E_OC_OVERFLOW, \
+    E_TC_OVERFLOW, E_TC_SUB, E_TC_DIV_OVERFLOW, E_BAD_INPUT = range(10)
+ERRORS = (None, 'Overflow', 'Underflow', 'Division by zero', 'Signed magnitude overflow',
+          "1's complement overflow", "2's complement overflow",
+          "2's complement subtraction error", "2's complement division overflow", 'Bad input')
+
+# BatchResult.status expected for each oracle error
+BATCH_STATUS = {
+    E_NONE: module_2.STATUS_OK, E_OVERFLOW: module_2.STATUS_OVERFLOW,
+    E_UNDERFLOW: module_2.STATUS_UNDERFLOW, E_DIV_ZERO: module_2.STATUS_DIV_BY_ZERO,
+    E_SM_OVERFLOW: module_2.STATUS_OVERFLOW, E_OC_OVERFLOW: module_2.STATUS_OVERFLOW,
+    E_TC_OVERFLOW: module_2.STATUS_OVERFLOW, E_TC_SUB: module_2.STATUS_SUB_ERROR,
+    E_TC_DIV_OVERFLOW: module_2.STATUS_OVERFLOW,
+}
+
+SAMPLE_WIDTHS = (13, 16, 24, 32, 48, 64, 128, 1024, 4096)
+EXAMPLES_PER_OPERATION = 3
+BLOCK_PAIRS = 1 << 16  # operand pairs per exhaustive job
+
+
+# --------------------------------------------------
+# Oracle
+# --------------------------------------------------
+#  Each function takes operand patterns a, b (ints or int64 arrays) and
+#  the width, and returns (error, value, remainder, carry, overflow);
+#  remainder is None for everything but division.
+
+def _where(cond, x, y):
+    if np is not None and isinstance(cond, np.ndarray):
+        return np.where(cond, x, y)
+    return x if cond else y
+
+
+def _unsigned_add(a, b, w):
+    s = a + b
+    over = s >> w != 0
+    return _where(over, E_OVERFLOW, E_NONE), s & ((1 << w) - 1), None, over, over
+
+
+def _unsigned_sub(a, b, w):
+    under = b > a
+    return _where(under, E_UNDERFLOW, E_NONE), (a - b) & ((1 << w) - 1), None, under, False
+
+
+def _unsigned_mul(a, b, w):
+    return E_NONE, a * b, None, False, False
+
+
+def _unsigned_div(a, b, w):
+    zero = b == 0
+    d = _where(zero, 1, b)
+    return _where(zero, E_DIV_ZERO, E_NONE), a // d, a % d, False, False
+
+
+def _sm_split(x, w):
+    return x >> (w - 1), x & ((1 << (w - 1)) - 1)
+
+
+def _sm_sum(sa, ma, sb, mb, w):
+    r = _where(sa == 1, -ma, ma) + _where(sb == 1, -mb, mb)
+    over = abs(r) >> (w - 1) != 0
+    # a zero sum keeps the sign only when both operands are negative
+    sign = _where(r < 0, 1, _where(r > 0, 0, sa & sb))
+    value = ((sign << (w - 1)) | abs(r)) & ((1 << w) - 1)
+    return _where(over, E_SM_OVERFLOW, E_NONE), value, None, over, over
+
+
+def _sm_add(a, b, w):
+    return _sm_sum(*_sm_split(a, w), *_sm_split(b, w), w)
+
+
+def _sm_sub(a, b, w):
+    sb, mb = _sm_split(b, w)
+    return _sm_sum(*_sm_split(a, w), 1 - sb, mb, w)
+
+
+def _sm_mul(a, b, w):
+    (sa, ma), (sb, mb) = _sm_split(a, w), _sm_split(b, w)
+    return E_NONE, ((sa ^ sb) << (2 * w - 2)) | (ma * mb), None, False, False
+
+
+def _sm_div(a, b, w):
+    (sa, ma), (sb, mb) = _sm_split(a, w), _sm_split(b, w)
+    zero = mb == 0
+    d = _where(zero, 1, mb)
+    q, r = ma // d, ma % d
+    return (_where(zero, E_DIV_ZERO, E_NONE), ((sa ^ sb) << (w - 1)) | q,
+            (sa << (w - 1)) | r, False, False)
+
+
+def _oc_value(x, w):
+    mask = (1 << w) - 1
+    return _where(x >> (w - 1) == 1, -(mask ^ x), x)
+
+
+def _oc_encode(r, w, negative):
+    # ones' complement pattern of |r| with the given sign
+    mask = (1 << w) - 1
+    return _where(negative, mask ^ abs(r), abs(r))
+
+
+def _oc_sum(a, b, w):
+    mask = (1 << w) - 1
+    carry = (a + b) >> w != 0
+    r = _oc_value(a, w) + _oc_value(b, w)
+    over = abs(r) >> (w - 1) != 0
+    # with the end-around carry, zero comes out as +0 only for +0 + +0
+    negative = _where(r == 0, (a | b) != 0, r < 0)
+    return _where(over, E_OC_OVERFLOW, E_NONE), _oc_encode(r, w, negative) & mask, None, carry, over
+
+
+def _oc_add(a, b, w):
+    return _oc_sum(a, b, w)
+
+
+def _oc_sub(a, b, w):
+    return _oc_sum(a, ((1 << w) - 1) ^ b, w)
+
+
+def _oc_mul(a, b, w):
+    ra, rb = _oc_value(a, w), _oc_value(b, w)
+    negative = (a >> (w - 1)) != (b >> (w - 1))
+    return E_NONE, _oc_encode(abs(ra) * abs(rb), 2 * w - 1, negative), None, False, False
+
+
+def _oc_div(a, b, w):
+    mask = (1 << w) - 1
+    zero = (b == 0) | (b == mask)
+    ma, mb = abs(_oc_value(a, w)), abs(_oc_value(b, w))
+    d = _where(zero, 1, mb)
+    sa, sb = a >> (w - 1), b >> (w - 1)
+    return (_where(zero, E_DIV_ZERO, E_NONE), _oc_encode(ma // d, w, sa != sb),
+            _oc_encode(ma % d, w, sa == 1), False, False)
+
+
+def _tc_value(x, w):
+    return _where(x >> (w - 1) == 1, x - (1 << w), x)
+
+
+def _tc_sum(a, b, r, w):
+    # b is the pattern actually added, r the exact integer result
+    carry = (a + b) >> w != 0
+    over = (r < -(1 << (w - 1))) | (r >= 1 << (w - 1))
+    return _where(over, E_TC_OVERFLOW, E_NONE), r & ((1 << w) - 1), None, carry, over
+
+
+def _tc_add(a, b, w):
+    return _tc_sum(a, b, _tc_value(a, w) + _tc_value(b, w), w)
+
+
+def _tc_sub(a, b, w):
+    mask = (1 << w) - 1
+    bad = b == 1 << (w - 1)
+    error, value, _, carry, over = _tc_sum(a, -b & mask, _tc_value(a, w) - _tc_value(b, w), w)
+    return (_where(bad, E_TC_SUB, error), value, None,
+            _where(bad, False, carry), _where(bad, False, over))
+
+
+def _tc_mul(a, b, w):
+    return E_NONE, (_tc_value(a, w) * _tc_value(b, w)) & ((1 << 2 * w) - 1), None, False, False
+
+
+def _tc_div(a, b, w):
+    mask = (1 << w) - 1
+    ra, rb = _tc_value(a, w), _tc_value(b, w)
+    zero = b == 0
+    over = (a == 1 << (w - 1)) & (b == mask)
+    d = _where(zero, 1, abs(rb))
+    q, r = abs(ra) // d, abs(ra) % d
+    q = _where((ra < 0) != (rb < 0), -q, q)
+    r = _where(ra < 0, -r, r)
+    error = _where(zero, E_DIV_ZERO, _where(over, E_TC_DIV_OVERFLOW, E_NONE))
+    return error, q & mask, r & mask, False, over
+
+
+ORACLES = {
+    # (representation, operation): (oracle, result width, minimum width, signed)
+    ('unsigned', 'add'): (_unsigned_add, 1, 0, False),
+    ('unsigned', 'subtract'): (_unsigned_sub, 1, 0, False),
+    ('unsigned', 'multiply'): (_unsigned_mul, 2, 0, False),
+    ('unsigned', 'divide'): (_unsigned_div, 1, 0, False),
+    ('signed', 'add'): (_sm_add, 1, 2, True),
+    ('signed', 'subtract'): (_sm_sub, 1, 2, True),
+    ('signed', 'multiply'): (_sm_mul, -1, 2, True),
+    ('signed', 'divide'): (_sm_div, 1, 2, True),
+    ('ones_complement', 'add'): (_oc_add, 1, 1, True),
+    ('ones_complement', 'subtract'): (_oc_sub, 1, 1, True),
+    ('ones_complement', 'multiply'): (_oc_mul, -1, 1, True),
+    ('ones_complement', 'divide'): (_oc_div, 1, 1, True),
+    ('twos_complement', 'add'): (_tc_add, 1, 1, True),
+    ('twos_complement', 'subtract'): (_tc_sub, 1, 1, True),
+    ('twos_complement', 'multiply'): (_tc_mul, 2, 1, True),
+    ('twos_complement', 'divide'): (_tc_div, 1, 1, True),
+}
+
+
+def _result_width(scale: int, w: int) -> int:
+    # 1: w bits, 2: 2w bits, -1: 2w - 1 bits
+    return w if scale == 1 else 2 * w if scale == 2 else 2 * w - 1
+
+
+def _column(x, n: int) -> list:
+    if np is not None and isinstance(x, np.ndarray):
+        return np.broadcast_to(x, (n,)).tolist()
+    return [x] * n
+
+
+def expected(key: tuple, a_values: list, b_values: list, w: int) -> list[tuple]:
+    """Oracle outcome per pair: (error message, value, remainder, carry, overflow, width)."""
+    oracle, scale, min_width, _ = ORACLES[key]
+    n = len(a_values)
+    if w < min_width:
+        return [('Bad input', None, None, False, False, None)] * n
+    if np is not None and w <= 31:
+        a, b = np.array(a_values, dtype=np.int64), np.array(b_values, dtype=np.int64)
+        columns = [_column(x, n) if x is not None else [None] * n for x in oracle(a, b, w)]
+        rows = zip(*columns)
+    else:
+        rows = (oracle(a, b, w) for a, b in zip(a_values, b_values))
+    width = _result_width(scale, w)
+    out = []
+    for error, value, remainder, carry, overflow in rows:
+        if error:
+            # failed operations report their flags but no bits
+            out.append((ERRORS[error], None, None, bool(carry), bool(overflow), None))
+        else:
+            out.append((None, value, remainder, bool(carry), bool(overflow), width))
+    return out
+
+
+# --------------------------------------------------
+# Engines under test
+# --------------------------------------------------
+
+def _bits(x: int, width: int) -> str:
+    # binary for narrow values, hex once the report line would get unwieldy
+    return format(x, f'0{width}b') if width <= 32 else f'0x{x:0{(width + 3) // 4}x}'
+
+
+def _describe(outcome: tuple, w: int) -> str:
+    error, value, remainder, carry, overflow, width = outcome[:6]
+    if error:
+        return f'error={error!r} carry={carry:d} overflow={overflow:d}'
+    text = f'value={_bits(value, width)}'
+    if remainder is not None:
+        text += f' rem={_bits(remainder, w)}'
+    return text + f' carry={carry:d} overflow={overflow:d}'
+
+
+def _check_results(key, a_values, b_values, want, compute):
+    # compare the ALUResults of compute(a, b) with the oracle
+    signed = ORACLES[key][3]
+    mismatches = []
+    for a, b, exp in zip(a_values, b_values, want):
+        result = compute(a, b)
+        if result.error:
+            got = (result.error, None, None, result.carry, result.overflow, None)
+            flags_ok = not (result.zero or result.negative)
+        else:
+            rem = result.remainder.value if result.remainder is not None else None
+            got = (None, result.value.value, rem, result.carry, result.overflow, result.value.width)
+            width = result.value.width
+            flags_ok = (result.zero == (result.value.value == 0)
+                        and result.negative == (signed and width > 0
+                                                and bool(result.value.value >> (width - 1))))
+        flags_ok = flags_ok and result.div_by_zero == (exp[0] == 'Division by zero')
+        if got != exp or not flags_ok:
+            mismatches.append((a, b, exp, got))
+    return mismatches
+
+
+def _operand(x: int, w: int) -> str:
+    # format() would give '0' for width 0
+    return format(x, f'0{w}b') if w else ''
+
+
+def _check_alu(key, a_values, b_values, w, want):
+    return _check_results(key, a_values, b_values, want, lambda a, b: module_2.compute_operation(
+        _operand(a, w), _operand(b, w), w, *key))
+
+
+def _check_packed(key, a_values, b_values, w, want):
+    size = (w + 7) // 8
+    return _check_results(key, a_values, b_values, want, lambda a, b: module_2.compute_packed(
+        a.to_bytes(size, 'big'), b.to_bytes(size, 'big'), w, *key))
+
+
+def _check_string(key, a_values, b_values, w, want):
+    entry = module_2.resolve_operation(*key)
+    mismatches = []
+    for a, b, exp in zip(a_values, b_values, want):
+        try:
+            out = entry.function(_operand(a, w), _operand(b, w), w)
+        except ValueError as e:
+            ok = str(e) == exp[0]
+            got = (str(e), None, None, False, False, None)
+        else:
+            value, rem = (out if isinstance(out, tuple) else (out, None))
+            got = (None, int(value, 2) if value else 0, int(rem, 2) if rem is not None else None,
+                   exp[3], exp[4], len(value))
+            ok = exp[0] is None and got == exp
+        if not ok:
+            mismatches.append((a, b, exp, got))
+    return mismatches
+
+
+def _check_batch(key, a_values, b_values, w, want):
+    if not max(1, ORACLES[key][2]) <= w <= 64:  # batch_operation raises outside these
+        return []
+    batch = module_2.batch_operation(np.array(a_values, dtype=np.uint64),
+                                     np.array(b_values, dtype=np.uint64), w, *key)
+    statuses = batch.status.tolist()
+    results = batch.result.tolist()
+    highs = batch.result_hi.tolist()
+    remainders = batch.remainder.tolist()
+    errors = {message: code for code, message in enumerate(ERRORS)}
+    mismatches = []
+    for i, (a, b, exp) in enumerate(zip(a_values, b_values, want)):
+        status = BATCH_STATUS[errors[exp[0]]]
+        if statuses[i] != status:
+            mismatches.append((a, b, exp, (f'status {statuses[i]}', None, None, False, False, None)))
+            continue
+        if exp[0] is not None:
+            continue
+        value = highs[i] << 64 | results[i]
+        rem = remainders[i] if exp[2] is not None else None
+        if value != exp[1] or rem != exp[2] or batch.width != exp[5]:
+            mismatches.append((a, b, exp, (None, value, rem, exp[3], exp[4], batch.width)))
+    return mismatches
+
+
+ENGINES = {'alu': _check_alu, 'packed': _check_packed, 'string': _check_string, 'batch': _check_batch}
+
+
+# --------------------------------------------------
+# Jobs
+# --------------------------------------------------
+
+def _sample_pairs(w: int, count: int, seed: int) -> tuple[list, list]:
+    rng = random.Random(seed)
+    mask, half = (1 << w) - 1, 1 << (w - 1)
+    edges = sorted({x for x in (0, 1, 2, half - 1, half, half + 1, mask - 1, mask) if 0 <= x <= mask})
+    pairs = [(x, y) for x in edges for y in edges]
+    pairs += [(rng.getrandbits(w), rng.getrandbits(w)) for _ in range(max(0, count - len(pairs)))]
+    return [x for x, _ in pairs], [y for _, y in pairs]
+
+
+def run_job(engine: str, key: tuple, w: int, a_lo: int, a_hi: int, samples: int, seed: int, tables: bool):
+    """Check one block; returns (key, width, pairs checked, mismatch count, examples)."""
+    if tables and w <= module_2.TABLE_MAX_WIDTH:
+        module_2.small_tables.configure(True)
+        module_2.small_tables.build(module_2.resolve_operation(*key), w)
+    else:
+        module_2.small_tables.configure(False)
+    module_2.operation_cache.configure(0, 0)  # check the arithmetic, not the cache
+    if samples:
+        a_values, b_values = _sample_pairs(w, samples, seed)
+    else:
+        n = 1 << w
+        a_values = [a for a in range(a_lo, a_hi) for _ in range(n)]
+        b_values = list(range(n)) * (a_hi - a_lo)
+    want = expected(key, a_values, b_values, w)
+    mismatches = ENGINES[engine](key, a_values, b_values, w, want)
+    examples = [f'{key[0]}/{key[1]} w={w} a={_bits(a, w)} b={_bits(b, w)}: '
+                f'expected {_describe(exp, w)}, got {_describe(got, w)}'
+                for a, b, exp, got in mismatches[:EXAMPLES_PER_OPERATION]]
+    return key, w, len(a_values), len(mismatches), examples
+
+
+def plan_jobs(engine: str, max_width: int, sample_widths, samples: int, seed: int, tables: bool):
+    keys = sorted({(e.representation.name, e.name) for e in module_2.OPERATIONS.values()})
+    jobs = []
+    for key in keys:
+        if key not in ORACLES:
+            continue
+        for w in range(0, max_width + 1):  # width 0 must fail cleanly, not raise
+            rows = max(1, BLOCK_PAIRS >> w)  # values of a per job
+            for a_lo in range(0, 1 << w, rows):
+                jobs.append((engine, key, w, a_lo, min(a_lo + rows, 1 << w), 0, seed, tables))
+        for w in sample_widths:
+            if w > max_width:
+                jobs.append((engine, key, w, 0, 0, samples, seed + w, tables))
+    return keys, jobs
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check module_2 against an integer oracle.")
+    parser.add_argument('--max-width', type=int, default=12, help="enumerate every pair up to this width")
+    parser.add_argument('--sample-widths', default=','.join(map(str, SAMPLE_WIDTHS)),
+                        help="comma-separated wider widths to sample ('' for none)")
+    parser.add_argument('--samples', type=int, default=2000, help="pairs per sampled width")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='alu',
+                        help="alu: compute_operation, string: the raising functions, batch: NumPy kernel")
+    parser.add_argument('--no-tables', action='store_true', help="bypass the small-width lookup tables")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.engine == 'batch' and np is None:
+        parser.error('the batch engine needs numpy')
+    sample_widths = [int(w) for w in args.sample_widths.split(',') if w.strip()]
+    keys, jobs = plan_jobs(args.engine, args.max_width, sample_widths, args.samples,
+                           args.seed, not args.no_tables)
+    skipped = [key for key in keys if key not in ORACLES]
+
+    start = time.perf_counter()
+    checked = {}
+    failed = {}
+    examples = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_job, *job) for job in jobs]
+        for future in as_completed(futures):
+            key, w, pairs, bad, job_examples = future.result()
+            checked[key] = checked.get(key, 0) + pairs
+            if bad:
+                failed.setdefault(key, {})
+                failed[key][w] = failed[key].get(w, 0) + bad
+                examples.setdefault(key, []).extend(job_examples)
+
+    elapsed = time.perf_counter() - start
+    total = sum(checked.values())
+    print(f"engine={args.engine} exhaustive<= {args.max_width} bits, sampled {sample_widths} "
+          f"({args.samples} pairs): {total:,} pairs in {elapsed:.1f}s")
+    for key in sorted(checked):
+        if key in failed:
+            widths = ', '.join(f'w{w}:{n}' for w, n in sorted(failed[key].items()))
+            print(f"FAIL {key[0]}/{key[1]}: {sum(failed[key].values())} of {checked[key]:,} ({widths})")
+            for line in sorted(examples[key])[:EXAMPLES_PER_OPERATION]:
+                print(f"     {line}")
+        else:
+            print(f"ok   {key[0]}/{key[1]}: {checked[key]:,}")
+    for key in skipped:
+        print(f"skip {key[0]}/{key[1]}: no oracle for this operation")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())